@@ -1,4 +1,11 @@
 from .main import main_function
 from .main import load
 from .main import compile_frenpy
+from .main import compile_frenpy_source
+from .main import compile_frenpy_stream
 from .main import get_words_frenpy
+from .vocabulary import get_vocabulary
+from .cache import compile_cached
+from .importer import install as install_importer
+from .engine import ExecutionEngine
+from .stats import CompileStats
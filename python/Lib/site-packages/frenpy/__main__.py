@@ -0,0 +1,16 @@
+import sys
+from .main import main_function, run_main
+
+if len(sys.argv) > 1 and sys.argv[1] == "build":
+    from .build import main
+    sys.exit(main(sys.argv[2:]))
+elif len(sys.argv) > 1 and sys.argv[1] == "run":
+    sys.exit(run_main(sys.argv[2:]))
+elif len(sys.argv) > 1 and sys.argv[1] == "worker":
+    from .worker import serve, PRELOAD_MODULES
+    sys.exit(serve(sys.argv[2:] or PRELOAD_MODULES))
+elif len(sys.argv) > 1 and sys.argv[1] == "host":
+    from .host import serve
+    sys.exit(serve())
+else:
+    main_function()
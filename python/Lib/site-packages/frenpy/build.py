@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from .vocabulary import get_vocabulary
+from .cache import CACHE_DIR_NAME
+from .importer import SOURCE_SUFFIX
+from .stats import CompileStats, _phase
+
+MANIFEST_NAME = ".frenpy-manifest.json"
+
+
+def find_sources(source_dir, output_dir):
+    output_dir = os.path.abspath(output_dir)
+    sources = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = [
+            name for name in dirs
+            if name != CACHE_DIR_NAME and os.path.abspath(os.path.join(root, name)) != output_dir
+        ]
+        for name in files:
+            if name.endswith(SOURCE_SUFFIX):
+                path = os.path.join(root, name)
+                sources.append(os.path.relpath(path, source_dir))
+    sources.sort()
+    return sources
+
+
+def output_path(output_dir, relpath):
+    return os.path.join(output_dir, relpath[:-len(SOURCE_SUFFIX)] + ".py")
+
+
+def read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(output_dir, manifest):
+    os.makedirs(output_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+
+
+def _build_one(task):
+    # Exécuté dans un processus du pool : lit, traduit et écrit un fichier.
+    source_dir, output_dir, relpath, previous_hash, collect_stats = task
+    start = time.perf_counter()
+    stats = CompileStats(relpath) if collect_stats else None
+    source = os.path.join(source_dir, relpath)
+    target = output_path(output_dir, relpath)
+    try:
+        with _phase(stats, "lecture"):
+            stat = os.stat(source)
+            with open(source, "rb") as file:
+                raw = file.read()
+            digest = hashlib.sha256(raw).hexdigest()
+        if digest == previous_hash and os.path.exists(target):
+            status = "inchangé"
+        else:
+            with _phase(stats, "traduction"):
+                text = raw.decode("utf-8")
+                vocabulary = get_vocabulary(workspace=os.path.abspath(source_dir))
+                compiled = vocabulary.translate(text, stats.hits if stats is not None else None)
+            with _phase(stats, "écriture"):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "w", encoding="utf-8") as file:
+                    file.write(compiled)
+            if stats is not None:
+                stats.bytes_in += len(text)
+                stats.bytes_out += len(compiled)
+            status = "compilé"
+        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        stats_data = stats.as_dict() if stats is not None else None
+        return relpath, status, entry, len(raw), time.perf_counter() - start, None, stats_data
+    except Exception as error:
+        return relpath, "erreur", None, 0, time.perf_counter() - start, str(error), None
+
+
+def build(source_dir, output_dir=None, jobs=None, force=False, verbose=True, collect_stats=False):
+    # Compile tous les .frenpy de source_dir dans une arborescence miroir.
+    # Seuls les fichiers modifiés depuis le dernier build sont retraduits.
+    # Le dossier compilé sert d'espace de travail : son vocabulaire
+    # .frenpy/words.json s'applique, y compris dans les processus du pool.
+    # Il est passé à get_vocabulary plutôt qu'installé par set_workspace, qui
+    # changerait la traduction de tout ce que le processus compile ensuite.
+    if output_dir is None:
+        output_dir = os.path.join(source_dir, "build")
+    started = time.perf_counter()
+    vocabulary = get_vocabulary(workspace=os.path.abspath(source_dir))
+    manifest = read_manifest(output_dir)
+    files = manifest.get("files", {})
+    sources = find_sources(source_dir, output_dir)
+    # Les sorties des sources supprimées se déduisent de l'ancien manifeste,
+    # avant qu'un changement de vocabulaire ne le vide.
+    for relpath in set(files) - set(sources):
+        del files[relpath]
+        try:
+            os.remove(output_path(output_dir, relpath))
+        except OSError:
+            pass
+    if force or manifest.get("vocabulary") != vocabulary.digest:
+        files = {}
+
+    tasks = []
+    for relpath in sources:
+        previous = files.get(relpath)
+        if previous:
+            try:
+                stat = os.stat(os.path.join(source_dir, relpath))
+            except OSError:
+                stat = None
+            if (stat and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size
+                    and os.path.exists(output_path(output_dir, relpath))):
+                continue
+        tasks.append((source_dir, output_dir, relpath, previous["sha256"] if previous else None, collect_stats))
+
+    if len(tasks) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(tasks) // ((jobs or os.cpu_count() or 1) * 4))
+            results = list(pool.map(_build_one, tasks, chunksize=chunksize))
+    else:
+        results = [_build_one(task) for task in tasks]
+
+    total_bytes = 0
+    errors = 0
+    totals = CompileStats(source_dir)
+    for relpath, status, entry, size, elapsed, error, stats_data in results:
+        if stats_data:
+            totals.merge(CompileStats.from_dict(stats_data))
+        if entry is None:
+            errors += 1
+            files.pop(relpath, None)
+            print(f"  {relpath} : erreur : {error}")
+            continue
+        files[relpath] = entry
+        total_bytes += size
+        if verbose:
+            print(f"  {relpath} : {status} en {elapsed * 1000:.2f} ms")
+
+    write_manifest(output_dir, {"vocabulary": vocabulary.digest, "files": files})
+    elapsed = time.perf_counter() - started
+    compiled = sum(1 for result in results if result[1] == "compilé")
+    throughput = total_bytes / elapsed / (1024 * 1024) if elapsed else 0.0
+    print(f"{len(sources)} fichiers, {compiled} compilés, {len(sources) - len(tasks)} à jour, {errors} erreurs "
+          f"en {elapsed:.3f} s ({throughput:.2f} Mo/s)")
+    if collect_stats:
+        print(totals.summary())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="frenpy build", description="Compile un dossier de fichiers .frenpy.")
+    parser.add_argument("source_dir")
+    parser.add_argument("-o", "--output", help="dossier de sortie (par défaut : <source_dir>/build)")
+    parser.add_argument("-j", "--jobs", type=int, help="nombre de processus (par défaut : nombre de CPU)")
+    parser.add_argument("-f", "--force", action="store_true", help="tout recompiler")
+    parser.add_argument("-q", "--quiet", action="store_true", help="ne pas afficher le détail par fichier")
+    parser.add_argument("-s", "--stats", action="store_true", help="temps par phase et mots les plus traduits")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.source_dir):
+        print(f"Erreur : le dossier {args.source_dir} est introuvable")
+        return 1
+    results = build(args.source_dir, args.output, args.jobs, args.force, not args.quiet, args.stats)
+    return 1 if any(result[2] is None for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
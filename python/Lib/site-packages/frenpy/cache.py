@@ -0,0 +1,197 @@
+import os
+import marshal
+import hashlib
+import tempfile
+import threading
+import importlib.util
+from .version import frpy_version
+from .vocabulary import get_vocabulary
+from .stats import CompileStats, hooks_installed, _phase
+
+CACHE_DIR_NAME = "__frenpycache__"
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# En-tête des .pyc basés sur un hash (PEP 552) : le fichier peut aussi être
+# lancé directement avec "python fichier.pyc".
+_PYC_FLAGS = (1).to_bytes(4, "little")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def user_cache_dir():
+    base = os.getenv("LOCALAPPDATA") or os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "frenpy", "cache")
+
+
+def source_key(source, filename, vocabulary, optimize=-1):
+    key = hashlib.sha256(source.encode("utf-8", "surrogatepass"))
+    key.update(f"\0{filename}\0{vocabulary.digest}\0{frpy_version}\0{optimize}\0".encode())
+    key.update(importlib.util.MAGIC_NUMBER)
+    return key.hexdigest()[:32]
+
+
+def entry_prefix(filename):
+    # Préfixe commun à toutes les versions compilées d'un même fichier,
+    # comme "module.cpython-312" dans __pycache__ : nom du fichier, puis hash
+    # du chemin, deux sources de même nom pouvant partager le cache
+    # utilisateur. None pour un texte sans fichier.
+    if not filename or not os.path.isfile(filename):
+        return None
+    path = os.path.abspath(filename)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}.{hashlib.sha256(path.encode('utf-8', 'surrogatepass')).hexdigest()[:8]}"
+
+
+class CompileCache:
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def source_path(self, key):
+        return os.path.join(self.directory, key + ".py")
+
+    def pyc_path(self, key):
+        return os.path.join(self.directory, key + ".pyc")
+
+    def get(self, key):
+        pyc_path = self.pyc_path(key)
+        try:
+            with open(pyc_path, "rb") as file:
+                data = file.read()
+            if data[:4] != importlib.util.MAGIC_NUMBER:
+                return None
+            code = marshal.loads(memoryview(data)[16:])
+            with open(self.source_path(key), "r", encoding="utf-8") as file:
+                python_source = file.read()
+            os.utime(pyc_path)
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        return python_source, code
+
+    def put(self, key, python_source, code, prefix=None):
+        # prefix (entry_prefix) : les autres entrées du même fichier sont
+        # périmées et supprimées, au lieu d'attendre l'éviction.
+        raw_source = python_source.encode("utf-8")
+        header = importlib.util.MAGIC_NUMBER + _PYC_FLAGS + importlib.util.source_hash(raw_source)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self.source_path(key), raw_source)
+            self._write(self.pyc_path(key), header + marshal.dumps(code))
+        except OSError:
+            return False
+        if prefix is not None:
+            for _, _, other in self.entries():
+                if other != key and other.rpartition(".")[0] == prefix:
+                    self.remove(other)
+        self.evict()
+        return True
+
+    def _write(self, path, payload):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def entries(self):
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".pyc"):
+                continue
+            key = name[:-4]
+            try:
+                stat = os.stat(self.pyc_path(key))
+                size = stat.st_size + os.path.getsize(self.source_path(key))
+            except OSError:
+                size = 0
+                stat = None
+            entries.append((stat.st_mtime if stat else 0, size, key))
+        return entries
+
+    def evict(self):
+        # Les entrées les moins récemment utilisées partent en premier.
+        entries = sorted(self.entries())
+        count = len(entries)
+        total = sum(entry[1] for entry in entries)
+        for _, size, key in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self.remove(key)
+            count -= 1
+            total -= size
+
+    def remove(self, key):
+        for path in (self.pyc_path(key), self.source_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for _, _, key in self.entries():
+            self.remove(key)
+
+
+def cache_for(filename, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+    # Comme __pycache__ : à côté du fichier source s'il existe et que le
+    # dossier est accessible en écriture, sinon dans le cache utilisateur.
+    directory = user_cache_dir()
+    if filename and os.path.isfile(filename):
+        source_dir = os.path.dirname(os.path.abspath(filename))
+        if os.access(source_dir, os.W_OK):
+            directory = os.path.join(source_dir, CACHE_DIR_NAME)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = CompileCache(directory, max_entries, max_bytes)
+        return cache
+
+
+def compile_cached(source, filename="<frenpy>", cache=None, optimize=-1, python_source=None, stats=None):
+    # Renvoie (code Python traduit, objet code, chemin du .pyc ou None).
+    # python_source évite de retraduire un texte déjà traduit, par exemple
+    # par une session IncrementalCompiler. Une SyntaxError du code traduit
+    # est propagée et rien n'est mis en cache. stats (CompileStats) reçoit
+    # les temps de traduction, de compilation Python et d'accès au cache.
+    owns_stats = stats is None and hooks_installed()
+    if owns_stats:
+        stats = CompileStats(filename)
+    vocabulary = get_vocabulary()
+    if cache is None:
+        cache = cache_for(filename)
+    key = source_key(source, filename, vocabulary, optimize)
+    prefix = entry_prefix(filename)
+    if prefix is not None:
+        key = f"{prefix}.{key}"
+    with _phase(stats, "cache"):
+        hit = cache.get(key)
+    if hit is not None:
+        result = hit[0], hit[1], cache.pyc_path(key)
+    else:
+        if python_source is None:
+            with _phase(stats, "traduction"):
+                python_source = vocabulary.translate(source, stats.hits if stats is not None else None)
+        with _phase(stats, "compilation"):
+            code = compile(python_source, filename, "exec", optimize=optimize)
+        with _phase(stats, "cache"):
+            stored = cache.put(key, python_source, code, prefix)
+        result = python_source, code, cache.pyc_path(key) if stored else None
+    if stats is not None:
+        stats.bytes_in += len(source)
+        stats.bytes_out += len(result[0])
+        if owns_stats:
+            stats.finish()
+    return result
@@ -0,0 +1,200 @@
+import os
+import re
+import math
+import heapq
+from collections import Counter, OrderedDict
+from .vocabulary import get_vocabulary
+from .importer import SOURCE_SUFFIX
+from .cache import CACHE_DIR_NAME
+
+_IDENTIFIER = re.compile(r"[^\W\d]\w{2,}")
+
+TOP_K = 32
+VOCABULARY_WEIGHT = 8
+RECENT_WORDS = 256
+RECENCY_WEIGHT = 4.0
+RECENCY_HALF_LIFE = 64
+
+
+def identifiers(text):
+    return _IDENTIFIER.findall(text)
+
+
+class _Node:
+    __slots__ = ("children", "word", "count", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.word = None
+        self.count = 0
+        # Meilleurs (compte, mot) du sous-arbre, recalculés à la demande
+        # quand une mise à jour passe par ce nœud.
+        self.top = None
+
+
+class PrefixTrie:
+    # Mots comptés, rangés par préfixe. Ajouter ou retirer un mot n'invalide
+    # que les nœuds de son chemin.
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+
+    def add(self, word, count=1):
+        node = self.root
+        node.top = None
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            node.top = None
+        if not node.count:
+            node.word = word
+            self.size += 1
+        node.count += count
+
+    def remove(self, word, count=1):
+        path = [self.root]
+        node = self.root
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if not node.count:
+            return
+        node.count = max(0, node.count - count)
+        if not node.count:
+            node.word = None
+            self.size -= 1
+        for parent, char, child in zip(reversed(path[:-1]), reversed(word), reversed(path)):
+            child.top = None
+            if not child.count and not child.children:
+                del parent.children[char]
+        self.root.top = None
+
+    def count(self, word):
+        node = self._find(word)
+        return node.count if node is not None else 0
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _top(self, node):
+        if node.top is None:
+            candidates = [(node.count, node.word)] if node.count else []
+            for child in node.children.values():
+                candidates.extend(self._top(child))
+            node.top = heapq.nlargest(TOP_K, candidates)
+        return node.top
+
+    def top(self, prefix):
+        # Jusqu'à TOP_K (compte, mot) commençant par prefix, du plus fréquent
+        # au moins fréquent.
+        node = self._find(prefix)
+        return self._top(node) if node is not None else []
+
+
+class CompletionIndex:
+    # Mots du vocabulaire, identifiants des documents ouverts (ligne par
+    # ligne, pour suivre les modifications) et symboles de l'espace de
+    # travail, dans un même PrefixTrie. Pas de verrou : un seul thread doit
+    # s'en servir.
+    def __init__(self, vocabulary=None):
+        self.trie = PrefixTrie()
+        self.vocabulary_words = []
+        self.documents = {}
+        self.files = {}
+        self.recent = OrderedDict()
+        self.tick = 0
+        self.set_vocabulary(vocabulary or get_vocabulary())
+
+    def set_vocabulary(self, vocabulary):
+        for word in self.vocabulary_words:
+            self.trie.remove(word, VOCABULARY_WEIGHT)
+        self.vocabulary_words = [word for word in vocabulary.words if word.strip()]
+        for word in self.vocabulary_words:
+            self.trie.add(word, VOCABULARY_WEIGHT)
+
+    def update_lines(self, document, first, old_count, lines):
+        # Les lignes first à first + old_count du document sont remplacées
+        # par lines. Seuls les mots dont le nombre change touchent le trie :
+        # une frappe ne modifie en général qu'un mot.
+        document_lines = self.documents.setdefault(document, [])
+        new_words = [identifiers(line) for line in lines]
+        old = Counter()
+        for words in document_lines[first:first + old_count]:
+            old.update(words)
+        new = Counter()
+        for words in new_words:
+            new.update(words)
+        trie = self.trie
+        for word, count in (old - new).items():
+            trie.remove(word, count)
+        for word, count in (new - old).items():
+            trie.add(word, count)
+        document_lines[first:first + old_count] = new_words
+
+    def remove_document(self, document):
+        for words in self.documents.pop(document, []):
+            for word in words:
+                self.trie.remove(word)
+
+    def set_file(self, path, text):
+        # Symboles d'un fichier de l'espace de travail, qui remplacent les
+        # précédents.
+        self.remove_file(path)
+        counts = Counter(identifiers(text))
+        for word, count in counts.items():
+            self.trie.add(word, count)
+        self.files[path] = counts
+
+    def remove_file(self, path):
+        for word, count in self.files.pop(path, {}).items():
+            self.trie.remove(word, count)
+
+    def scan_workspace(self, directory):
+        for path in list(self.files):
+            self.remove_file(path)
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = [name for name in dirs if name != CACHE_DIR_NAME and not name.startswith(".")]
+            for name in names:
+                if name.endswith(SOURCE_SUFFIX):
+                    path = os.path.join(root, name)
+                    try:
+                        with open(path, "r", encoding="utf-8", errors="replace") as file:
+                            self.set_file(path, file.read())
+                    except OSError:
+                        continue
+
+    def touch(self, word):
+        # Mot choisi dans la liste : il remonte pendant quelque temps.
+        self.tick += 1
+        self.recent[word] = self.tick
+        self.recent.move_to_end(word)
+        while len(self.recent) > RECENT_WORDS:
+            self.recent.popitem(last=False)
+
+    def _score(self, word, count):
+        used = self.recent.get(word)
+        boost = RECENCY_WEIGHT * 0.5 ** ((self.tick - used) / RECENCY_HALF_LIFE) if used else 0.0
+        return math.log1p(count) + boost
+
+    def complete(self, prefix, limit=20):
+        if not prefix:
+            return []
+        trie = self.trie
+        candidates = {word: count for count, word in trie.top(prefix)}
+        for word in self.recent:
+            if word.startswith(prefix) and word not in candidates:
+                count = trie.count(word)
+                if count:
+                    candidates[word] = count
+        candidates.pop(prefix, None)
+        ranked = sorted(candidates.items(), key=lambda item: (-self._score(*item), item[0]))
+        return [word for word, _ in ranked[:limit]]
@@ -0,0 +1,126 @@
+import os
+import sys
+import types
+import hashlib
+import builtins
+import importlib
+import linecache
+import threading
+from collections import OrderedDict
+from .cache import compile_cached
+from .vocabulary import get_vocabulary
+
+DEFAULT_MAX_CODE_OBJECTS = 256
+# Modules dont le code traduit se sert sans les importer : "attendre"
+# devient time.sleep, "nouvelle_écran" os.system("cls"). L'ancien exec de
+# main.py les trouvait dans ses propres globales.
+RUNTIME_MODULES = ("os", "time", "re", "json")
+
+
+def add_runtime_modules(namespace):
+    for name in RUNTIME_MODULES:
+        namespace.setdefault(name, importlib.import_module(name))
+
+
+class ExecutionEngine:
+    # Compile une fois en objet code et garde les objets code en mémoire :
+    # relancer le même script ne retraduit ni ne recompile rien.
+    def __init__(self, optimize=-1, max_code_objects=DEFAULT_MAX_CODE_OBJECTS, disk_cache=True):
+        self.optimize = optimize
+        self.max_code_objects = max_code_objects
+        self.disk_cache = disk_cache
+        self._codes = OrderedDict()
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._codes[key] = entry
+            self._codes.move_to_end(key)
+            while len(self._codes) > self.max_code_objects:
+                self._codes.popitem(last=False)
+
+    def compile(self, source, filename="<frenpy>", translate=True, stats=None):
+        # Renvoie (code Python, objet code). filename apparaît dans les
+        # tracebacks ; pour un texte sans fichier, ses lignes sont ajoutées à
+        # linecache afin que les tracebacks les affichent aussi.
+        # Le vocabulaire fait partie de la clé : après un changement de
+        # vocabulaire, le texte est retraduit.
+        digest = hashlib.sha256(source.encode("utf-8", "surrogatepass")).digest()
+        vocabulary = get_vocabulary().digest if translate else None
+        key = (filename, digest, vocabulary, translate, self.optimize)
+        with self._lock:
+            entry = self._codes.get(key)
+            if entry is not None:
+                self._codes.move_to_end(key)
+                return entry
+        if not translate:
+            entry = source, compile(source, filename, "exec", optimize=self.optimize)
+        elif self.disk_cache:
+            python_source, code, _ = compile_cached(source, filename, optimize=self.optimize, stats=stats)
+            entry = python_source, code
+        else:
+            python_source = get_vocabulary().translate(source, stats.hits if stats is not None else None)
+            entry = python_source, compile(python_source, filename, "exec", optimize=self.optimize)
+        if not os.path.isfile(filename):
+            lines = source.splitlines(True)
+            linecache.cache[filename] = (len(source), None, lines, filename)
+        self._remember(key, entry)
+        return entry
+
+    def compile_file(self, path):
+        # Un fichier dont la date et la taille n'ont pas changé n'est même
+        # pas relu.
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size, get_vocabulary().digest, self.optimize)
+        cached = self._files.get(path)
+        if cached and cached[0] == signature:
+            return cached[1], cached[2]
+        with open(path, "r", encoding="utf-8") as file:
+            source = file.read()
+        python_source, code = self.compile(source, path, translate=path.endswith(".frenpy"))
+        self._files[path] = (signature, python_source, code)
+        return python_source, code
+
+    def new_module(self, name="__main__", filename=None):
+        module = types.ModuleType(name)
+        module.__builtins__ = builtins
+        add_runtime_modules(module.__dict__)
+        if filename:
+            module.__file__ = filename
+        return module
+
+    def execute(self, code, module=None, run_name="__main__"):
+        # Exécute code dans un vrai module. Pendant l'exécution, le module
+        # remplace sys.modules[run_name] pour que pickle, inspect et les
+        # imports circulaires le retrouvent ; l'ancien module est ensuite
+        # restauré.
+        if module is None:
+            filename = None if code.co_filename.startswith("<") else code.co_filename
+            module = self.new_module(run_name, filename)
+        previous = sys.modules.get(run_name)
+        sys.modules[run_name] = module
+        try:
+            exec(code, module.__dict__)
+        finally:
+            if previous is None:
+                sys.modules.pop(run_name, None)
+            else:
+                sys.modules[run_name] = previous
+        return module
+
+    def run_source(self, source, filename="<frenpy>", run_name="__main__"):
+        _, code = self.compile(source, filename)
+        return self.execute(code, run_name=run_name)
+
+    def run_file(self, path, run_name="__main__"):
+        _, code = self.compile_file(path)
+        return self.execute(code, run_name=run_name)
+
+    def clear(self):
+        with self._lock:
+            self._codes.clear()
+            self._files.clear()
+
+
+default_engine = ExecutionEngine()
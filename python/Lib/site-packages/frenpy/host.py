@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+from .importer import SOURCE_SUFFIX
+from .engine import RUNTIME_MODULES
+
+try:
+    import _xxsubinterpreters as interpreters
+except ImportError:
+    interpreters = None
+
+# Ligne écrite sur stdout après chaque exécution, suivie du code de sortie,
+# de FALLBACK ou de UNAVAILABLE.
+END_MARKER = b"\x00frenpy-host:"
+# Le script importe un module d'extension refusé par les sous-interpréteurs :
+# il doit être relancé dans un processus.
+FALLBACK = "repli"
+UNAVAILABLE = "indisponible"
+
+# Exécuté dans le sous-interpréteur, qui reçoit de run_string code,
+# filename, source, search_path, frenpy_imports, runtime_modules (voir
+# engine.RUNTIME_MODULES) et status_fd. Le code est déjà
+# traduit : sans import de frenpy, un sous-interpréteur neuf démarre en
+# quelques millisecondes.
+_RUN = """
+import os
+import sys
+import types
+import builtins
+sys.stdout.reconfigure(line_buffering=True)
+sys.argv = [filename]
+sys.path.insert(0, search_path)
+_status = "0"
+try:
+    if source is not None:
+        import linecache
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    if frenpy_imports:
+        from frenpy.importer import install
+        install()
+    _module = types.ModuleType("__main__")
+    _module.__builtins__ = builtins
+    for _name in runtime_modules.split():
+        setattr(_module, _name, __import__(_name))
+    if os.path.isfile(filename):
+        _module.__file__ = filename
+    sys.modules["__main__"] = _module
+    exec(compile(code, filename, "exec"), _module.__dict__)
+except SystemExit as error:
+    if error.code is None or isinstance(error.code, int):
+        _status = str(error.code or 0)
+    else:
+        print(error.code, file=sys.stderr)
+        _status = "1"
+except BaseException as error:
+    if isinstance(error, ImportError) and "subinterpreter" in str(error):
+        _status = "repli"
+    else:
+        import traceback
+        _tb = error.__traceback__
+        while _tb is not None and _tb.tb_frame.f_code.co_filename != filename:
+            _tb = _tb.tb_next
+        traceback.print_exception(type(error), error, _tb)
+        _status = "1"
+finally:
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.write(status_fd, _status.encode())
+"""
+
+
+def _read_line(fd):
+    # Octet par octet : rien de ce qui suit n'est consommé, la suite de stdin
+    # revient au script.
+    line = bytearray()
+    while True:
+        byte = os.read(fd, 1)
+        if not byte:
+            return None
+        if byte == b"\n":
+            return bytes(line)
+        line += byte
+
+
+def _read_exact(fd, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def run_request(request):
+    # Un sous-interpréteur neuf par exécution, détruit ensuite.
+    filename = request.get("filename") or "<frenpy>"
+    search_path = request.get("search_path")
+    if not search_path:
+        search_path = os.path.dirname(os.path.abspath(filename)) if os.path.isfile(filename) else os.getcwd()
+    try:
+        frenpy_imports = any(name.endswith(SOURCE_SUFFIX) for name in os.listdir(search_path))
+    except OSError:
+        frenpy_imports = False
+    read_fd, write_fd = os.pipe()
+    shared = {
+        "code": request["code"], "filename": filename, "source": request.get("source"),
+        "search_path": search_path, "frenpy_imports": int(frenpy_imports),
+        "runtime_modules": " ".join(RUNTIME_MODULES), "status_fd": write_fd,
+    }
+    interpreter = interpreters.create()
+    try:
+        interpreters.run_string(interpreter, _RUN, shared)
+    except Exception as error:
+        os.write(write_fd, b"1")
+        print(error, file=sys.stderr)
+    finally:
+        interpreters.destroy(interpreter)
+        os.close(write_fd)
+    status = os.read(read_fd, 64).decode() or "1"
+    os.close(read_fd)
+    return status
+
+
+def serve():
+    # python -m frenpy host
+    # Processus gardé toute la session par l'IDE. Chaque demande arrive sur
+    # stdin sous la forme "<taille>\n<JSON>" et s'exécute dans un
+    # sous-interpréteur ; END_MARKER signale la fin. Une seule exécution à la
+    # fois : pendant qu'elle tourne, stdin est au script.
+    if interpreters is None:
+        os.write(1, END_MARKER + UNAVAILABLE.encode() + b"\n")
+        return 1
+    while True:
+        header = _read_line(0)
+        if not header:
+            return 0
+        payload = _read_exact(0, int(header))
+        if payload is None:
+            return 0
+        status = run_request(json.loads(payload))
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.write(1, END_MARKER + status.encode() + b"\n")
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
@@ -0,0 +1,79 @@
+import os
+import sys
+import importlib.abc
+import importlib.util
+import importlib.machinery
+from .cache import compile_cached
+from .engine import add_runtime_modules
+
+SOURCE_SUFFIX = ".frenpy"
+
+
+class FrenpyLoader(importlib.abc.FileLoader, importlib.abc.SourceLoader):
+    # get_source() renvoie le texte .frenpy : la traduction conserve les
+    # numéros de ligne, les tracebacks pointent donc sur les bonnes lignes.
+    def get_code(self, fullname):
+        source = importlib.util.decode_source(self.get_data(self.path))
+        _, code, _ = compile_cached(source, self.path)
+        return code
+
+    def exec_module(self, module):
+        add_runtime_modules(module.__dict__)
+        super().exec_module(module)
+
+
+class FrenpyFinder(importlib.abc.MetaPathFinder):
+    # Placé après PathFinder : il ne voit que les noms que Python n'a pas
+    # trouvés. Un import ordinaire ne coûte donc rien de plus, et foo.frenpy
+    # ne masque jamais un module foo de la bibliothèque standard ou de
+    # site-packages. En contrepartie, un dossier sans __init__.py devient un
+    # paquet namespace avant d'arriver ici : son __init__.frenpy n'est pas
+    # exécuté, mais ses modules .frenpy s'importent normalement. Chaque
+    # dossier a son FileFinder, qui garde le contenu du dossier en cache.
+    def __init__(self, lazy=False):
+        self.lazy = lazy
+        self._finders = {}
+
+    def _finder(self, entry):
+        finder = self._finders.get(entry)
+        if finder is None:
+            finder = importlib.machinery.FileFinder(entry or os.getcwd(), (FrenpyLoader, [SOURCE_SUFFIX]))
+            self._finders[entry] = finder
+        return finder
+
+    def find_spec(self, fullname, path=None, target=None):
+        for entry in sys.path if path is None else path:
+            if not isinstance(entry, str) or (entry and not os.path.isdir(entry)):
+                continue
+            spec = self._finder(entry).find_spec(fullname, target)
+            if spec is None or spec.loader is None:
+                continue
+            if self.lazy:
+                spec.loader = importlib.util.LazyLoader(spec.loader)
+            return spec
+        return None
+
+    def invalidate_caches(self):
+        for finder in self._finders.values():
+            finder.invalidate_caches()
+
+
+def install(lazy=None):
+    # lazy=None garde le réglage d'un finder déjà installé.
+    for finder in sys.meta_path:
+        if isinstance(finder, FrenpyFinder):
+            if lazy is not None:
+                finder.lazy = lazy
+            return finder
+    finder = FrenpyFinder(bool(lazy))
+    position = len(sys.meta_path)
+    for index, existing in enumerate(sys.meta_path):
+        if existing is importlib.machinery.PathFinder:
+            position = index + 1
+            break
+    sys.meta_path.insert(position, finder)
+    return finder
+
+
+def uninstall():
+    sys.meta_path[:] = [finder for finder in sys.meta_path if not isinstance(finder, FrenpyFinder)]
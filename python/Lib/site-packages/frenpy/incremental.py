@@ -0,0 +1,168 @@
+from bisect import bisect_right
+from .vocabulary import get_vocabulary
+from .translator import _scan, _translate_fstring, _STRING_BODIES, _ends_with_continuation
+
+
+def _open_literal(rest, start):
+    # Délimiteur du littéral ouvert en rest[start:], précédé de "f" s'il
+    # s'agit d'une f-string : '"""', 'f"', ...
+    quote_at = start
+    while rest[quote_at] not in "\"'":
+        quote_at += 1
+    prefix = rest[start:quote_at].lower()
+    quote = rest[quote_at:quote_at + 3]
+    if quote not in _STRING_BODIES:
+        quote = rest[quote_at]
+    return ("f" if "f" in prefix else "") + quote, quote_at + len(quote)
+
+
+def translate_line(line, state, index):
+    # Traduit une ligne sans son "\n". state est le littéral resté ouvert à la
+    # fin de la ligne précédente ("" sinon) ; renvoie (ligne traduite, state).
+    out = []
+    pos = 0
+    if state:
+        is_fstring = state[0] == "f"
+        quote = state.lstrip("f")
+        body = _STRING_BODIES[quote].match(line)
+        if body.group(1) is None:
+            if len(quote) == 1 and not _ends_with_continuation(line):
+                state = ""
+            return (_translate_fstring(line, index) if is_fstring else line), state
+        fragment = line[:body.end()]
+        out.append(_translate_fstring(fragment, index) if is_fstring else fragment)
+        pos = body.end()
+    rest = line[pos:]
+    parts, last, consumed = _scan(rest, index, True)
+    out.extend(parts)
+    out.append(rest[last:consumed])
+    state = ""
+    if consumed < len(rest):
+        state, body_start = _open_literal(rest, consumed)
+        fragment = rest[consumed:]
+        out.append(_translate_fstring(fragment, index) if state[0] == "f" else fragment)
+        if len(state.lstrip("f")) == 1 and not _ends_with_continuation(rest):
+            state = ""
+    return "".join(out), state
+
+
+class IncrementalCompiler:
+    def __init__(self, source="", vocabulary=None):
+        self.vocabulary = vocabulary or get_vocabulary()
+        self.reset(source)
+
+    def reset(self, source=""):
+        index = self.vocabulary.index
+        self.lines = source.split("\n")
+        self.compiled = []
+        # states[i] : littéral ouvert au début de la ligne i.
+        self.states = []
+        state = ""
+        for line in self.lines:
+            self.states.append(state)
+            compiled, state = translate_line(line, state, index)
+            self.compiled.append(compiled)
+        self.length = len(source)
+        self._starts = [0]
+        self._valid = 0
+        self._text = None
+
+    def _locate(self, offset):
+        lines = self.lines
+        starts = self._starts
+        valid = self._valid
+        last_line = len(lines) - 1
+        while valid < last_line and starts[valid] + len(lines[valid]) < offset:
+            following = starts[valid] + len(lines[valid]) + 1
+            valid += 1
+            if valid < len(starts):
+                starts[valid] = following
+            else:
+                starts.append(following)
+        self._valid = valid
+        line = bisect_right(starts, offset, 0, valid + 1) - 1
+        return line, offset - starts[line]
+
+    def _advance(self, line, column, count):
+        lines = self.lines
+        last_line = len(lines) - 1
+        while line < last_line and column + count > len(lines[line]):
+            count -= len(lines[line]) + 1 - column
+            line += 1
+            column = 0
+        return line, min(column + count, len(lines[line]))
+
+    def apply_change(self, position, removed, inserted):
+        # Applique une modification du document et renvoie la plage modifiée
+        # du code compilé : (première ligne, lignes remplacées, nouvelles
+        # lignes). position est un décalage en caractères ou, plus rapide sur
+        # un gros document, un couple (ligne, colonne) ; removed est le
+        # nombre de caractères supprimés.
+        if isinstance(position, tuple):
+            first = max(0, min(position[0], len(self.lines) - 1))
+            first_col = max(0, min(position[1], len(self.lines[first])))
+        else:
+            first, first_col = self._locate(max(0, min(position, self.length)))
+        last, last_col = self._advance(first, first_col, max(0, removed))
+        removed = sum(map(len, self.lines[first:last])) + (last - first) + last_col - first_col
+        text = self.lines[first][:first_col] + inserted + self.lines[last][last_col:]
+        new_lines = text.split("\n")
+        self.lines[first:last + 1] = new_lines
+        self.length += len(inserted) - removed
+        self._valid = min(self._valid, first)
+        self._text = None
+
+        index = self.vocabulary.index
+        old_count = last + 1 - first
+        old_states = self.states[last + 1:last + 2]
+        state = self.states[first]
+        new_states = []
+        new_compiled = []
+        for line in new_lines:
+            new_states.append(state)
+            compiled, state = translate_line(line, state, index)
+            new_compiled.append(compiled)
+        # Un littéral ouvert ou refermé se propage aux lignes suivantes
+        # jusqu'à ce que l'état redevienne celui d'avant.
+        following = last + 1
+        while old_states and old_states[0] != state and following < len(self.states):
+            new_states.append(state)
+            compiled, state = translate_line(self.lines[first + len(new_states) - 1], state, index)
+            new_compiled.append(compiled)
+            old_count += 1
+            following += 1
+            old_states = self.states[following:following + 1]
+        self.states[first:first + old_count] = new_states
+        self.compiled[first:first + old_count] = new_compiled
+        return first, old_count, new_compiled
+
+    def set_vocabulary(self, vocabulary):
+        # Seules les lignes contenant un mot ajouté, retiré ou modifié sont
+        # retraduites. Un mot contenant un guillemet ou un # peut changer le
+        # découpage des littéraux : tout est alors retraduit.
+        changed = self.vocabulary.changed_words(vocabulary)
+        self.vocabulary = vocabulary
+        if not changed:
+            return []
+        if any(mark in word for word in changed for mark in "\"'#"):
+            self.reset(self.source_text())
+            return [(0, len(self.lines), self.compiled)]
+        index = vocabulary.index
+        ranges = []
+        for number, line in enumerate(self.lines):
+            if any(word in line for word in changed):
+                compiled, _ = translate_line(line, self.states[number], index)
+                if compiled != self.compiled[number]:
+                    self.compiled[number] = compiled
+                    ranges.append((number, 1, [compiled]))
+        if ranges:
+            self._text = None
+        return ranges
+
+    def compiled_text(self):
+        if self._text is None:
+            self._text = "\n".join(self.compiled)
+        return self._text
+
+    def source_text(self):
+        return "\n".join(self.lines)
@@ -0,0 +1,78 @@
+from .translator import _TOKEN, _STRING_BODIES, _STRING_PREFIXES, _match_keyword, _ends_with_continuation
+
+KEYWORD = "keyword"
+STRING = "string"
+COMMENT = "comment"
+
+# Délimiteurs de littéral pouvant rester ouverts d'une ligne à l'autre ; leur
+# position (+ 1) sert d'état de bloc entier à l'éditeur.
+STATES = ("", '"""', "'''", '"', "'")
+
+
+class Lexer:
+    # Découpe une ligne en mots-clés, littéraux et commentaires en un seul
+    # passage, avec le même index de mots-clés que le traducteur : le coût
+    # par ligne ne dépend pas de la taille du vocabulaire.
+    def __init__(self, index):
+        self.index = index
+
+    def _string(self, line, start, quote_at, spans):
+        # Renvoie la fin du littéral et le délimiteur resté ouvert.
+        quote = line[quote_at:quote_at + 3]
+        if quote not in _STRING_BODIES:
+            quote = line[quote_at]
+        body = _STRING_BODIES[quote].match(line, quote_at + len(quote))
+        end = body.end()
+        if body.group(1) is not None or (len(quote) == 1 and not _ends_with_continuation(line)):
+            spans.append((start, end - start, STRING))
+            return end, ""
+        spans.append((start, len(line) - start, STRING))
+        return len(line), quote
+
+    def highlight(self, line, state=""):
+        # Renvoie ([(début, longueur, nature)], état) pour une ligne sans son
+        # "\n" ; state est le littéral ouvert à la fin de la ligne précédente.
+        spans = []
+        pos = 0
+        length = len(line)
+        if state:
+            body = _STRING_BODIES[state].match(line)
+            if body.group(1) is None:
+                spans.append((0, length, STRING))
+                if len(state) == 1 and not _ends_with_continuation(line):
+                    state = ""
+                return spans, state
+            pos = body.end()
+            spans.append((0, pos, STRING))
+            state = ""
+        index = self.index
+        search = _TOKEN.search
+        while True:
+            match = search(line, pos)
+            if match is None:
+                break
+            start = match.start()
+            token = match.group()
+            if token == "#":
+                spans.append((start, length - start, COMMENT))
+                break
+            if token == '"' or token == "'":
+                pos, state = self._string(line, start, start, spans)
+                if state:
+                    break
+                continue
+            end = match.end()
+            if end < length and line[end] in "\"'" and token.lower() in _STRING_PREFIXES:
+                pos, state = self._string(line, start, end, spans)
+                if state:
+                    break
+                continue
+            candidates = index.get(token)
+            if candidates:
+                found = _match_keyword(line, start, candidates)
+                if found:
+                    spans.append((start, found[0] - start, KEYWORD))
+                    pos = found[0]
+                    continue
+            pos = end
+        return spans, state
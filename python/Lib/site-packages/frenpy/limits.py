@@ -0,0 +1,109 @@
+import os
+import sys
+import signal
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Codes de sortie d'un script arrêté par une limite, pour que l'IDE sache
+# laquelle a été atteinte. 152 = 128 + SIGXCPU, comme dans un shell.
+CPU_EXIT_CODE = 152
+MEMORY_EXIT_CODE = 153
+# Code donné par Windows à un processus tué par la limite de temps d'un
+# Job (ERROR_NOT_ENOUGH_QUOTA).
+WINDOWS_CPU_EXIT_CODE = 1816
+
+# Garde une référence au Job : le fermer lèverait les limites.
+_job = None
+
+
+def _cpu_exceeded(signum, frame):
+    sys.stderr.write("Limite de temps CPU atteinte.\n")
+    sys.stderr.flush()
+    os._exit(CPU_EXIT_CODE)
+
+
+def _apply_posix(cpu_seconds, memory_mb):
+    if cpu_seconds:
+        # SIGXCPU à la limite douce, SIGKILL une seconde plus tard si le
+        # script est bloqué dans du code C.
+        signal.signal(signal.SIGXCPU, _cpu_exceeded)
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        limit = int(used.ru_utime + used.ru_stime) + cpu_seconds
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 1))
+    if memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb << 20, memory_mb << 20))
+
+
+def _apply_windows(cpu_seconds, memory_mb):
+    # Job créé par le processus pour lui-même : mémoire engagée et temps
+    # utilisateur plafonnés par le système.
+    global _job
+    import ctypes
+    from ctypes import wintypes
+
+    class BasicLimits(ctypes.Structure):
+        _fields_ = [
+            ("PerProcessUserTimeLimit", ctypes.c_int64),
+            ("PerJobUserTimeLimit", ctypes.c_int64),
+            ("LimitFlags", wintypes.DWORD),
+            ("MinimumWorkingSetSize", ctypes.c_size_t),
+            ("MaximumWorkingSetSize", ctypes.c_size_t),
+            ("ActiveProcessLimit", wintypes.DWORD),
+            ("Affinity", ctypes.c_size_t),
+            ("PriorityClass", wintypes.DWORD),
+            ("SchedulingClass", wintypes.DWORD),
+        ]
+
+    class IoCounters(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_uint64) for name in (
+            "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+            "ReadTransferCount", "WriteTransferCount", "OtherTransferCount")]
+
+    class ExtendedLimits(ctypes.Structure):
+        _fields_ = [
+            ("BasicLimitInformation", BasicLimits),
+            ("IoInfo", IoCounters),
+            ("ProcessMemoryLimit", ctypes.c_size_t),
+            ("JobMemoryLimit", ctypes.c_size_t),
+            ("PeakProcessMemoryUsed", ctypes.c_size_t),
+            ("PeakJobMemoryUsed", ctypes.c_size_t),
+        ]
+
+    job_object_limit_process_time = 0x2
+    job_object_limit_process_memory = 0x100
+    job_object_extended_limit_information = 9
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    limits = ExtendedLimits()
+    if cpu_seconds:
+        limits.BasicLimitInformation.LimitFlags |= job_object_limit_process_time
+        limits.BasicLimitInformation.PerProcessUserTimeLimit = cpu_seconds * 10_000_000
+    if memory_mb:
+        limits.BasicLimitInformation.LimitFlags |= job_object_limit_process_memory
+        limits.ProcessMemoryLimit = memory_mb << 20
+    job = kernel32.CreateJobObjectW(None, None)
+    if not job:
+        raise OSError(ctypes.get_last_error(), "CreateJobObject")
+    if not kernel32.SetInformationJobObject(job, job_object_extended_limit_information,
+                                            ctypes.byref(limits), ctypes.sizeof(limits)):
+        raise OSError(ctypes.get_last_error(), "SetInformationJobObject")
+    if not kernel32.AssignProcessToJobObject(job, kernel32.GetCurrentProcess()):
+        raise OSError(ctypes.get_last_error(), "AssignProcessToJobObject")
+    _job = job
+
+
+def apply_limits(limits):
+    # limits : {"cpu_seconds": ..., "memory_mb": ...}, 0 ou absent = sans
+    # limite. À appeler dans le processus du script, avant de l'exécuter.
+    cpu_seconds = int(limits.get("cpu_seconds") or 0)
+    memory_mb = int(limits.get("memory_mb") or 0)
+    if not cpu_seconds and not memory_mb:
+        return
+    if resource is not None:
+        _apply_posix(cpu_seconds, memory_mb)
+    elif sys.platform == "win32":
+        _apply_windows(cpu_seconds, memory_mb)
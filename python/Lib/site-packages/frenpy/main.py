@@ -1,6 +1,15 @@
 import os
-
-frpy_version = "3"
+import sys
+import json
+import runpy
+import linecache
+import codecs
+from contextlib import nullcontext
+from .version import frpy_version
+from .vocabulary import get_vocabulary
+from .engine import default_engine
+from .stats import CompileStats, hooks_installed, _phase
+from .importer import install as install_importer
 
 try:
     import time
@@ -36,19 +45,8 @@ def main_function():
         print("_____")
         print("| frenpy compiled executor")
         File_toexecute = input("Quel fichier exécuter ? ")
-        if File_toexecute.endswith(".py"):
-            with open(File_toexecute, 'r', encoding='utf-8') as file:
-                exec(file.read())
-        elif File_toexecute.endswith(".frenpy"):
-            data_code = recup_donnee_fichier(File_toexecute)
-            compiled_code = compile_frenpy(File_toexecute)
-            if compiled_code:
-                if "frpy_debug=True" in compiled_code:
-                    print("Code compilé :\n", compiled_code)
-                    print("Code source :\n", data_code)
-                if "frpy_scc=True" in data_code:
-                    save_actual_file("compiled.py", compiled_code)
-                exec(compiled_code)
+        if File_toexecute.endswith(".py") or File_toexecute.endswith(".frenpy"):
+            load(File_toexecute)
         elif File_toexecute == "":
             print("Erreur : vous n'avez choisi aucun fichier")
         else:
@@ -58,21 +56,25 @@ def main_function():
     except Exception as error:
         print("Erreur : " + str(error))
 
-def load(File_toexec):
+def load(File_toexec, engine=None):
+    # Le code est exécuté dans un module __main__ neuf ; engine permet de
+    # choisir le niveau d'optimisation et garde les objets code compilés.
     try:
+        engine = engine or default_engine
         data_code = recup_donnee_fichier(File_toexec)
         if data_code:
             if File_toexec.endswith(".py"):
-                exec(data_code)
+                _, code = engine.compile(data_code, File_toexec, translate=False)
+                return engine.execute(code)
             elif File_toexec.endswith(".frenpy"):
-                compiled_code = compile_frenpy(File_toexec)
-                if compiled_code:
-                    if "frpy_debug=True" in compiled_code:
-                        print("Code compilé :\n", compiled_code)
-                        print("Code source :\n", data_code) 
-                    if "frpy_scc=True" in data_code:
-                        save_actual_file("compiled.py", compiled_code)
-                    exec(compiled_code)
+                add_import_path(File_toexec)
+                compiled_code, code = engine.compile(data_code, File_toexec)
+                if "frpy_debug=True" in data_code:
+                    print("Code compilé :\n", compiled_code)
+                    print("Code source :\n", data_code)
+                if "frpy_scc=True" in data_code:
+                    save_actual_file("compiled.py", compiled_code)
+                return engine.execute(code)
             elif File_toexec == "":
                 print("Erreur : vous n'avez choisi aucun fichier")
             else:
@@ -82,6 +84,53 @@ def load(File_toexec):
     except Exception as error:
         print("Erreur : " + str(error))
 
+def add_import_path(script_path):
+    # Les modules .frenpy voisins du script deviennent importables.
+    install_importer()
+    script_dir = os.path.dirname(os.path.abspath(script_path))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+def run_script(script_path, search_path=None, argv=()):
+    # Exécute un .frenpy, .py ou .pyc comme programme principal, avec
+    # l'import des modules .frenpy activé.
+    install_importer()
+    sys.path.insert(0, search_path or os.path.dirname(os.path.abspath(script_path)))
+    sys.argv = [script_path, *argv]
+    if not script_path.endswith(".frenpy"):
+        runpy.run_path(script_path, run_name="__main__")
+        return
+    default_engine.run_file(script_path)
+
+def run_code(python_source, filename, search_path=None, argv=(), source=None, profiler=None):
+    # Comme run_script, pour un code déjà traduit et reçu en mémoire : rien
+    # n'est lu ni écrit sur le disque. La traduction garde les numéros de
+    # ligne, les tracebacks pointent donc sur le fichier .frenpy ; source,
+    # le texte .frenpy tel qu'il a été lancé, remplace ce fichier s'il
+    # n'existe pas ou n'a pas été enregistré. profiler (frenpy.profiler)
+    # ne mesure que l'exécution, pas la compilation.
+    install_importer()
+    if search_path is None and os.path.isfile(filename):
+        search_path = os.path.dirname(os.path.abspath(filename))
+    sys.path.insert(0, search_path or os.getcwd())
+    sys.argv = [filename, *argv]
+    _, code = default_engine.compile(python_source, filename, translate=False)
+    if source is not None:
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    with profiler if profiler is not None else nullcontext():
+        default_engine.execute(code)
+
+def run_main(argv):
+    # python -m frenpy run [--path DOSSIER] fichier [arguments...]
+    search_path = None
+    if len(argv) >= 2 and argv[0] == "--path":
+        search_path, argv = argv[1], argv[2:]
+    if not argv:
+        print("Erreur : vous n'avez choisi aucun fichier")
+        return 1
+    run_script(argv[0], search_path, argv[1:])
+    return 0
+
 def load_replacement_words(json_file):
     try:
         base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -94,24 +143,83 @@ def load_replacement_words(json_file):
 
 def get_words_frenpy():
     try:
-        replacement_words = load_replacement_words('words.json')
-        return list(replacement_words.keys())
+        return list(get_vocabulary().words.keys())
     except Exception as e:
         print(f"Erreur lors de la récupération des mots : {e}")
         return []
 
-def compile_frenpy(file_to_compile):
-    import re
-    data = recup_donnee_fichier(file_to_compile)
+def compile_frenpy(file_to_compile, with_stats=False):
+    stats = CompileStats(file_to_compile) if with_stats or hooks_installed() else None
+    with _phase(stats, "lecture"):
+        data = recup_donnee_fichier(file_to_compile)
     if data is None:
-        return None
+        return (None, stats) if with_stats else None
+    return compile_frenpy_source(data, with_stats=with_stats, stats=stats)
+
+def compile_frenpy_source(source, encoding='utf-8', with_stats=False, stats=None):
+    # Avec with_stats=True, renvoie (code, CompileStats) : temps par phase et
+    # nombre de remplacements par mot du vocabulaire.
+    if stats is None and (with_stats or hooks_installed()):
+        stats = CompileStats()
+    try:
+        with _phase(stats, "lecture"):
+            if not isinstance(source, str):
+                source = str(source, encoding)
+        with _phase(stats, "traduction"):
+            compiled = get_vocabulary().translate(source, stats.hits if stats is not None else None)
+    except Exception as errors:
+        print("-Erreur lors de l'étape de compilation")
+        print("-Echec : " + str(errors))
+        exit()
+    if stats is not None:
+        stats.bytes_in += len(source)
+        stats.bytes_out += len(compiled)
+        stats.finish()
+    return (compiled, stats) if with_stats else compiled
+
+def _iter_source_text(source, encoding, chunk_size):
+    if isinstance(source, str):
+        yield source
+        return
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        view = memoryview(source)
+    except TypeError:
+        view = None
+    if view is not None:
+        with view:
+            for start in range(0, len(view), chunk_size):
+                yield decoder.decode(view[start:start + chunk_size])
+    else:
+        for piece in source:
+            yield piece if isinstance(piece, str) else decoder.decode(piece)
+    yield decoder.decode(b'', final=True)
+
+def compile_frenpy_stream(source, chunk_size=1 << 16, encoding='utf-8'):
+    # source : itérable de lignes (str ou bytes), bytes, memoryview ou mmap.
+    # Le texte est découpé en fin de ligne, jamais au milieu d'un littéral.
     try:
-        replacement_words = load_replacement_words('words.json')
-        if "frpy_info" in data:
-            data = re.sub(r'\bfrpy_info\b', f'print("version actuelle : {frpy_version}")', data)
-        for fr_word, py_word in replacement_words.items():
-            data = re.sub(rf'(?<!")\b{fr_word}\b(?!")', py_word, data)
-        return data
+        vocabulary = get_vocabulary()
+        pending = []
+        pending_size = 0
+        threshold = chunk_size
+        for text in _iter_source_text(source, encoding, chunk_size):
+            pending.append(text)
+            pending_size += len(text)
+            if pending_size < threshold:
+                continue
+            buffered = ''.join(pending)
+            cut = buffered.rfind('\n') + 1
+            compiled, consumed = vocabulary.translate_prefix(buffered[:cut])
+            if compiled:
+                yield compiled
+            rest = buffered[consumed:]
+            pending = [rest]
+            pending_size = len(rest)
+            threshold = chunk_size if consumed else max(threshold * 2, pending_size + chunk_size)
+        buffered = ''.join(pending)
+        if buffered:
+            yield vocabulary.translate(buffered)
     except Exception as errors:
         print("-Erreur lors de l'étape de compilation")
         print("-Echec : " + str(errors))
@@ -0,0 +1,152 @@
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+# Ligne écrite sur stdout à la fin d'une exécution profilée, suivie des
+# résultats en JSON.
+PROFILE_MARKER = b"\x00frenpy-profile:"
+SAMPLE_INTERVAL = 0.001
+MAX_FUNCTIONS = 200
+# Depuis Python 3.12, cProfile suit tous les threads avec une seule pile
+# d'appels : les appels de l'échantillonneur s'y mêlent à ceux du script et
+# faussent appelants et temps. Les fonctions sont alors mesurées elles aussi
+# par échantillonnage, sans nombre d'appels.
+SAMPLED_FUNCTIONS = sys.version_info >= (3, 12)
+
+
+class Profiler:
+    # cProfile pour les temps par fonction (ou l'échantillonneur, voir
+    # SAMPLED_FUNCTIONS), et un échantillonneur pour les temps par ligne :
+    # toutes les SAMPLE_INTERVAL secondes, la ligne du fichier filename la
+    # plus profonde de la pile du thread principal est comptée. Pas de table de correspondance entre lignes : la traduction
+    # remplace des mots à l'intérieur des lignes, et le chargement du
+    # vocabulaire refuse tout mot ou remplacement contenant un saut de ligne
+    # (vocabulary._parse_layer). Les numéros sont donc ceux du .frenpy.
+    def __init__(self, filename, interval=SAMPLE_INTERVAL):
+        self.filename = filename
+        self.interval = interval
+        self.profile = None if SAMPLED_FUNCTIONS else cProfile.Profile()
+        self.lines = Counter()
+        # Échantillons par fonction (fichier, ligne, nom) : en haut de la
+        # pile, et n'importe où dans la pile.
+        self.own = Counter()
+        self.total = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self.finished = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self, thread_id):
+        filename = self.filename
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            self.samples += 1
+            # Pile du script, du cadre le plus profond jusqu'au premier cadre
+            # de filename : le worker et le moteur qui le lancent n'en font
+            # pas partie.
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            while stack and stack[-1].f_code.co_filename != filename:
+                stack.pop()
+            if not stack:
+                continue
+            for frame in stack:
+                if frame.f_code.co_filename == filename:
+                    self.lines[frame.f_lineno] += 1
+                    break
+            if self.profile is None:
+                self.own[_function(stack[0].f_code)] += 1
+                for code in {frame.f_code for frame in stack}:
+                    self.total[_function(code)] += 1
+
+    def __enter__(self):
+        self._switch_interval = sys.getswitchinterval()
+        # Sans cela, l'échantillonneur n'obtient le GIL que toutes les 5 ms.
+        sys.setswitchinterval(self.interval)
+        self._thread = threading.Thread(target=self._sample, args=(threading.get_ident(),), daemon=True)
+        self._thread.start()
+        self._started = time.perf_counter()
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profile is not None:
+            self.profile.disable()
+        self.elapsed = time.perf_counter() - self._started
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        self.finished = True
+        return False
+
+    def results(self):
+        # Fonctions : [fichier, ligne, nom, appels, temps propre, temps
+        # cumulé], du plus coûteux au moins coûteux ; appels vaut None
+        # pour des fonctions échantillonnées. Lignes : {numéro:
+        # échantillons} pour filename.
+        functions = []
+        if self.profile is not None:
+            stats = pstats.Stats(self.profile)
+            for (filename, lineno, name), (calls, own, total) in self._script_functions(stats.stats).items():
+                functions.append([filename, lineno, name, calls, own, total])
+        else:
+            sample = self.elapsed / self.samples if self.samples else 0.0
+            for function, count in self.total.items():
+                functions.append([*function, None, self.own[function] * sample, count * sample])
+        functions.sort(key=lambda entry: entry[4], reverse=True)
+        return {
+            "filename": self.filename,
+            "elapsed": self.elapsed,
+            "interval": self.interval,
+            "samples": self.samples,
+            "functions": functions[:MAX_FUNCTIONS],
+            "lines": {str(line): count for line, count in self.lines.items()},
+        }
+
+    def _script_functions(self, entries):
+        # Les fonctions du script et celles qu'il appelle, directement ou
+        # non : pas le moteur qui prépare son module. Une fonction appelée
+        # aussi d'ailleurs ne compte que les appels venus du script.
+        kept = {func: (calls, own, total) for func, (_, calls, own, total, _) in entries.items()
+                if func[0] == self.filename}
+        changed = True
+        while changed:
+            changed = False
+            for func, (_, calls, own, total, callers) in entries.items():
+                if func[0] == self.filename:
+                    continue
+                counts = [count for caller, count in callers.items() if caller in kept]
+                if not counts:
+                    continue
+                if len(counts) < len(callers):
+                    calls = sum(count[0] for count in counts)
+                    own = sum(count[2] for count in counts)
+                    total = sum(count[3] for count in counts)
+                if kept.get(func) != (calls, own, total):
+                    kept[func] = (calls, own, total)
+                    changed = True
+        return kept
+
+
+def _function(code):
+    # Même clé que cProfile.
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def write_results(profiler):
+    # Après la sortie du script, sur le vrai stdout même si le script l'a
+    # remplacé. Rien si le script n'a pas démarré (erreur de syntaxe).
+    if not profiler.finished:
+        return
+    stream = sys.__stdout__
+    stream.flush()
+    stream.buffer.write(PROFILE_MARKER + json.dumps(profiler.results()).encode() + b"\n")
+    stream.flush()
@@ -0,0 +1,88 @@
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+_hooks = []
+
+
+def add_hook(callback):
+    # callback(stats) est appelé après chaque compilation instrumentée.
+    if callback not in _hooks:
+        _hooks.append(callback)
+
+
+def remove_hook(callback):
+    if callback in _hooks:
+        _hooks.remove(callback)
+
+
+def hooks_installed():
+    return bool(_hooks)
+
+
+def _phase(stats, name):
+    # Mesure une phase si des statistiques sont collectées.
+    return stats.phase(name) if stats is not None else nullcontext()
+
+
+class CompileStats:
+    def __init__(self, name="<frenpy>"):
+        self.name = name
+        self.phases = {}
+        self.hits = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+    def merge(self, other):
+        for name, elapsed in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+        self.hits.update(other.hits)
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        return self
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "phases": dict(self.phases),
+            "hits": dict(self.hits),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data.get("name", "<frenpy>"))
+        stats.phases = dict(data.get("phases", {}))
+        stats.hits = Counter(data.get("hits", {}))
+        stats.bytes_in = data.get("bytes_in", 0)
+        stats.bytes_out = data.get("bytes_out", 0)
+        return stats
+
+    def finish(self):
+        for callback in list(_hooks):
+            callback(self)
+        return self
+
+    def summary(self, top=10):
+        lines = [f"Statistiques de compilation : {self.name}"]
+        for name, elapsed in self.phases.items():
+            lines.append(f"  {name} : {elapsed * 1000:.2f} ms")
+        lines.append(f"  total : {self.total * 1000:.2f} ms ({self.bytes_in} caractères lus, {self.bytes_out} produits)")
+        if self.hits:
+            lines.append("  mots les plus traduits :")
+            for word, count in self.hits.most_common(top):
+                lines.append(f"    {word} : {count}")
+        return "\n".join(lines)
@@ -0,0 +1,126 @@
+import re
+
+_TOKEN = re.compile(r"\w+|[\"'#]")
+_WORD_CHAR = re.compile(r"\w")
+_LEADING_WORD = re.compile(r"\w+")
+_FSTRING_FIELD = re.compile(r"\{\{|\}\}|\{([^{}]*)\}")
+
+_STRING_PREFIXES = {"r", "u", "b", "f", "br", "rb", "fr", "rf"}
+
+_STRING_BODIES = {
+    '"': re.compile(r'(?:[^"\\\n]|\\.)*(")?', re.S),
+    "'": re.compile(r"(?:[^'\\\n]|\\.)*(')?", re.S),
+    '"""': re.compile(r'(?:[^"\\]|\\.|"(?!""))*(""")?', re.S),
+    "'''": re.compile(r"(?:[^'\\]|\\.|'(?!''))*(''')?", re.S),
+}
+
+
+def _ends_with_continuation(line):
+    # Un nombre impair de "\" en fin de ligne prolonge un littéral simple.
+    stripped = line.rstrip("\\")
+    return (len(line) - len(stripped)) % 2 == 1
+
+
+def build_keyword_index(replacement_words):
+    # Les mots-clés sont rangés par premier mot, du plus long au plus court,
+    # pour que "importer comme" passe avant "importer".
+    index = {}
+    for fr_word, py_word in replacement_words.items():
+        leading = _LEADING_WORD.match(fr_word)
+        if not leading:
+            continue
+        ends_with_word = bool(_WORD_CHAR.fullmatch(fr_word[-1]))
+        index.setdefault(leading.group(), []).append((fr_word, py_word, ends_with_word))
+    for candidates in index.values():
+        candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+    return index
+
+
+def _match_keyword(data, start, candidates):
+    for fr_word, py_word, ends_with_word in candidates:
+        end = start + len(fr_word)
+        if not data.startswith(fr_word, start):
+            continue
+        if ends_with_word and _WORD_CHAR.match(data, end):
+            continue
+        return end, fr_word, py_word
+    return None
+
+
+def _string_end(data, quote_start):
+    # Renvoie la fin du littéral et s'il a été refermé.
+    quote = data[quote_start:quote_start + 3]
+    if quote not in _STRING_BODIES:
+        quote = data[quote_start]
+    body = _STRING_BODIES[quote].match(data, quote_start + len(quote))
+    return body.end(), body.group(1) is not None
+
+
+def _translate_fstring(literal, index, hits=None):
+    def field(match):
+        if match.group(1) is None:
+            return match.group()
+        return "{" + translate(match.group(1), index, hits) + "}"
+    return _FSTRING_FIELD.sub(field, literal)
+
+
+def _scan(data, index, partial, hits=None):
+    out = []
+    last = 0
+    pos = 0
+    length = len(data)
+    search = _TOKEN.search
+    while True:
+        match = search(data, pos)
+        if match is None:
+            break
+        start = match.start()
+        token = match.group()
+        if token == "#":
+            newline = data.find("\n", start)
+            pos = length if newline == -1 else newline
+            continue
+        if token == '"' or token == "'":
+            pos, closed = _string_end(data, start)
+            if partial and not closed and (pos == length or data[pos] == "\\"):
+                return out, last, start
+            continue
+        end = match.end()
+        if end < length and data[end] in "\"'" and token.lower() in _STRING_PREFIXES:
+            pos, closed = _string_end(data, end)
+            if partial and not closed and (pos == length or data[pos] == "\\"):
+                return out, last, start
+            if "f" in token.lower():
+                out.append(data[last:start])
+                out.append(_translate_fstring(data[start:pos], index, hits))
+                last = pos
+            continue
+        candidates = index.get(token)
+        if candidates:
+            found = _match_keyword(data, start, candidates)
+            if found:
+                out.append(data[last:start])
+                out.append(found[2])
+                last = pos = found[0]
+                if hits is not None:
+                    hits[found[1]] += 1
+                continue
+        pos = end
+    return out, last, length
+
+
+def translate(data, index, hits=None):
+    # hits, un Counter facultatif, reçoit le nombre de remplacements par mot.
+    out, last, _ = _scan(data, index, False, hits)
+    if not out:
+        return data
+    out.append(data[last:])
+    return "".join(out)
+
+
+def translate_prefix(data, index, hits=None):
+    # Traduit sans couper un littéral encore ouvert en fin de données ;
+    # renvoie le texte traduit et le nombre de caractères consommés.
+    out, last, consumed = _scan(data, index, True, hits)
+    out.append(data[last:consumed])
+    return "".join(out), consumed
@@ -0,0 +1 @@
+frpy_version = "3"
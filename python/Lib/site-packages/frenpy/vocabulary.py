@@ -0,0 +1,217 @@
+import os
+import json
+import marshal
+import hashlib
+import tempfile
+import threading
+from .version import frpy_version
+from .translator import translate, translate_prefix, build_keyword_index
+from .lexer import Lexer
+
+# 2 : les remplacements sur plusieurs lignes sont refusés ; un artefact
+# écrit avant ne doit pas être relu.
+VOCABULARY_FORMAT = 2
+ARTIFACT_SUFFIX = ".frpyvoc"
+WORKSPACE_VOCABULARY = os.path.join(".frenpy", "words.json")
+USER_VOCABULARY = "words.json"
+WORKSPACE_ENV = "FRENPY_WORKSPACE"
+MAX_LAYER_ARTIFACTS = 16
+
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+_loaded = {}
+_lock = threading.Lock()
+
+
+def builtin_words():
+    return {"frpy_info": f'print("version actuelle : {frpy_version}")'}
+
+
+class Vocabulary:
+    def __init__(self, words, digest="", index=None):
+        self.words = words
+        self.digest = digest
+        if index is None:
+            index = build_keyword_index({**words, **builtin_words()})
+        self.index = index
+        self._lexer = None
+
+    @property
+    def lexer(self):
+        # Construit à la demande : seul l'éditeur en a besoin.
+        if self._lexer is None:
+            self._lexer = Lexer(self.index)
+        return self._lexer
+
+    def translate(self, data, hits=None):
+        return translate(data, self.index, hits)
+
+    def translate_prefix(self, data, hits=None):
+        return translate_prefix(data, self.index, hits)
+
+    def changed_words(self, other):
+        # Mots ajoutés, retirés ou traduits autrement dans other.
+        changed = {word for word in self.words if other.words.get(word) != self.words[word]}
+        changed.update(word for word in other.words if word not in self.words)
+        return changed
+
+    def to_bytes(self):
+        return marshal.dumps((VOCABULARY_FORMAT, self.digest, self.words, self.index))
+
+    @classmethod
+    def from_bytes(cls, payload, digest):
+        fmt, stored_digest, words, index = marshal.loads(payload)
+        if fmt != VOCABULARY_FORMAT or stored_digest != digest:
+            raise ValueError("artefact de vocabulaire périmé")
+        return cls(words, digest, index)
+
+
+def vocabulary_digest(*raws):
+    key = hashlib.sha256()
+    for raw in raws:
+        key.update(hashlib.sha256(raw).digest())
+    key.update(f"\0{frpy_version}\0{VOCABULARY_FORMAT}".encode())
+    return key.hexdigest()
+
+
+def user_vocabulary_path():
+    base = os.getenv("APPDATA") or os.getenv("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "frenpy", USER_VOCABULARY)
+
+
+def set_workspace(workspace):
+    # Passé aussi aux processus enfants (scripts lancés, build parallèle)
+    # par l'environnement.
+    if workspace:
+        os.environ[WORKSPACE_ENV] = os.path.abspath(workspace)
+    else:
+        os.environ.pop(WORKSPACE_ENV, None)
+
+
+def vocabulary_layers(json_file="words.json", workspace=None):
+    # Couches fusionnées dans cet ordre, la dernière l'emporte : vocabulaire
+    # intégré, vocabulaire de l'espace de travail, vocabulaire utilisateur.
+    layers = [os.path.join(_base_dir, json_file)]
+    workspace = workspace or os.getenv(WORKSPACE_ENV)
+    if workspace:
+        layers.append(os.path.join(workspace, WORKSPACE_VOCABULARY))
+    layers.append(user_vocabulary_path())
+    return layers
+
+
+def _artifact_path(json_path, digest):
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    cache_dir = os.path.join(os.path.dirname(json_path), "__pycache__")
+    return cache_dir, os.path.join(cache_dir, f"{name}.{digest[:16]}{ARTIFACT_SUFFIX}")
+
+
+def _layers_artifact_path(digest):
+    base = os.getenv("LOCALAPPDATA") or os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    cache_dir = os.path.join(base, "frenpy", "cache", "vocabulary")
+    return cache_dir, os.path.join(cache_dir, f"layers.{digest[:16]}{ARTIFACT_SUFFIX}")
+
+
+def _read_artifact(path, digest):
+    try:
+        with open(path, "rb") as file:
+            return Vocabulary.from_bytes(file.read(), digest)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def _write_artifact(cache_dir, path, vocabulary, keep=0):
+    # Comme pour les .pyc, un dossier en lecture seule n'empêche pas de
+    # compiler. Seuls les keep artefacts les plus récents du même nom sont
+    # gardés en plus du nouveau.
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        prefix = os.path.basename(path).split(".")[0] + "."
+        old = [
+            os.path.join(cache_dir, entry) for entry in os.listdir(cache_dir)
+            if entry.startswith(prefix) and entry.endswith(ARTIFACT_SUFFIX)
+        ]
+        old.sort(key=os.path.getmtime, reverse=True)
+        for entry in old[keep:]:
+            os.remove(entry)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(vocabulary.to_bytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _parse_layer(path, raw):
+    words = json.loads(raw.decode("utf-8"))
+    if not isinstance(words, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in words.items()):
+        raise ValueError(f"{path} doit contenir un objet JSON de mots vers du code Python")
+    # La traduction garde les numéros de ligne : les tracebacks, le
+    # profileur et la traduction incrémentale en dépendent. Un mot ou un
+    # remplacement sur plusieurs lignes les décalerait.
+    for word, replacement in words.items():
+        if any(char in word or char in replacement for char in "\r\n"):
+            raise ValueError(f"{path} : {word!r} contient un saut de ligne")
+    return words
+
+
+def load_vocabulary(*json_paths):
+    # Le premier fichier est obligatoire ; une couche suivante illisible est
+    # signalée puis ignorée.
+    raws = []
+    for index, path in enumerate(json_paths):
+        try:
+            with open(path, "rb") as file:
+                raws.append((path, file.read()))
+        except OSError:
+            if index == 0:
+                raise
+    digest = vocabulary_digest(*(raw for _, raw in raws))
+    if len(raws) == 1:
+        cache_dir, artifact = _artifact_path(raws[0][0], digest)
+    else:
+        cache_dir, artifact = _layers_artifact_path(digest)
+    vocabulary = _read_artifact(artifact, digest)
+    if vocabulary is None:
+        words = {}
+        for index, (path, raw) in enumerate(raws):
+            try:
+                words.update(_parse_layer(path, raw))
+            except ValueError as e:
+                if index == 0:
+                    raise
+                print(f"Erreur dans le vocabulaire {path}, ignoré : {e}")
+        vocabulary = Vocabulary(words, digest)
+        _write_artifact(cache_dir, artifact, vocabulary, keep=0 if len(raws) == 1 else MAX_LAYER_ARTIFACTS)
+    return vocabulary
+
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def get_vocabulary(json_file="words.json", workspace=None):
+    # Rechargé automatiquement dès qu'une des couches change sur le disque.
+    layers = vocabulary_layers(json_file, workspace)
+    key = tuple(layers)
+    try:
+        signature = _signature(layers)
+        if signature[0] is None:
+            raise FileNotFoundError(layers[0])
+        with _lock:
+            cached = _loaded.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            vocabulary = load_vocabulary(*(path for path, stat in zip(layers, signature) if stat))
+            if cached and cached[1].digest == vocabulary.digest:
+                vocabulary = cached[1]
+            _loaded[key] = (signature, vocabulary)
+            return vocabulary
+    except Exception as e:
+        print(f"Erreur lors de la lecture du fichier JSON {json_file} : {e}")
+        return Vocabulary({})
@@ -0,0 +1,82 @@
+import sys
+import json
+import importlib
+import traceback
+from .vocabulary import get_vocabulary
+from .importer import install as install_importer
+from .main import run_script, run_code
+from .limits import apply_limits, MEMORY_EXIT_CODE
+from .profiler import Profiler, write_results
+
+# Modules importés avant la demande d'exécution : un script qui s'en sert
+# ne paie plus leur import.
+PRELOAD_MODULES = ("runpy", "json", "re", "math", "random", "time", "datetime", "collections", "itertools", "functools")
+
+
+def preload(modules=PRELOAD_MODULES):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def print_exception(error, filename):
+    # Traceback à partir du script, sans les cadres du worker. Affiché par
+    # traceback plutôt que par sys.excepthook, qui relit le fichier sur le
+    # disque au lieu de linecache.
+    tb = error.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != filename:
+        tb = tb.tb_next
+    traceback.print_exception(type(error), error, tb)
+
+
+def serve(modules=PRELOAD_MODULES):
+    # python -m frenpy worker [modules...]
+    # Interpréteur lancé par l'IDE, souvent d'avance. Il prépare le runtime
+    # frenpy puis attend sur stdin une ligne JSON, exécute le script demandé
+    # et s'arrête : chaque exécution a un interpréteur neuf. La suite de
+    # stdin reste au script (saisir). La demande contient soit "path", un
+    # fichier à lancer, soit "code", le code Python traduit, avec
+    # "filename" et, pour un texte jamais enregistré, "source" (le .frenpy,
+    # pour les tracebacks), et "profile" pour une exécution sous
+    # frenpy.profiler. Clés communes : "search_path", "argv" et "limits",
+    # les limites de frenpy.limits.apply_limits.
+    preload(modules)
+    install_importer()
+    get_vocabulary()
+    # Sortie ligne par ligne, pour que la console suive le script.
+    sys.stdout.reconfigure(line_buffering=True)
+    header = sys.stdin.readline()
+    if not header.strip():
+        return 0
+    request = json.loads(header)
+    limits = request.get("limits") or {}
+    apply_limits(limits)
+    try:
+        if "code" not in request:
+            run_script(request["path"], request.get("search_path"), request.get("argv", ()))
+            return 0
+        filename = request.get("filename") or "<frenpy>"
+        profiler = Profiler(filename) if request.get("profile") else None
+        try:
+            run_code(request["code"], filename, request.get("search_path"), request.get("argv", ()),
+                     request.get("source"), profiler)
+        except Exception as error:
+            if isinstance(error, MemoryError) and limits.get("memory_mb"):
+                raise
+            print_exception(error, filename)
+            return 1
+        finally:
+            if profiler is not None:
+                write_results(profiler)
+    except MemoryError:
+        if not limits.get("memory_mb"):
+            raise
+        sys.stderr.write("Limite de mémoire atteinte.\n")
+        return MEMORY_EXIT_CODE
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve(sys.argv[1:] or PRELOAD_MODULES))
@@ -0,0 +1,212 @@
+import os
+import sys
+import ast
+import gc
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+
+try:
+    import frenpy
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python", "Lib", "site-packages"))
+    import frenpy
+from frenpy import get_vocabulary
+
+# Référence versionnée avec le dépôt, enregistrée par --save (tailles par
+# défaut) ; la plateforme et la version de Python y sont notées. À
+# réenregistrer après une accélération voulue ou sur une autre machine de
+# référence.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "bench_compiler.json")
+DEFAULT_SIZES = [1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20, 100 << 20]
+QUICK_SIZES = [1 << 10, 10 << 10, 100 << 10, 1 << 20]
+# Au-delà, ast.parse et compile() demandent plusieurs Go de mémoire.
+DEFAULT_PYTHON_PHASES_LIMIT = 10 << 20
+
+
+def _dense(rng, n):
+    return rng.choice([
+        f"si x_{n} et non y_{n} ou vrai: afficher(longueur(liste([{n}, 2])))\n",
+        f"pour i_{n} dans la plage({n}): afficher(arrondir(i_{n} / 3))\n",
+        f"tant que faux et vrai: stopper\n",
+        f"essayer: afficher(type(ensemble([{n}])))\nexcept Exception: passer\n",
+    ])
+
+
+def _sparse(rng, n):
+    if rng.random() < 0.05:
+        return f"afficher(valeur_{n})\n"
+    return f"valeur_{n} = valeur_{n - 1} * {rng.randint(2, 9)} + {rng.randint(0, 99)}\n"
+
+
+def _strings(rng, n):
+    return rng.choice([
+        f'texte_{n} = "si afficher pour tant que {n} répéter" + \'vrai ou faux\'  # si commentaire\n',
+        f'doc_{n} = """\nsi afficher\nrépéter à l\'infini {n}\n"""\n',
+        f'f_{n} = f"{{longueur(texte_{n})}} caractères si vrai"\n',
+    ])
+
+
+def _accents(rng, n):
+    return rng.choice([
+        f"élève_{n} = créé_{n} + déjà_{n} * réponse_{n}\n",
+        f"afficher(élève_{n}, façade_{n}, où_{n})\n",
+        f"si élève_{n} > café_{n}: nouvelle_écran\n",
+    ])
+
+
+def _multiword(rng, n):
+    return rng.choice([
+        f"tant que compteur_{n} < {n}: passer\n",
+        f"répéter à l'infini: stopper\n",
+        f"x_{n} = n'importe lequel([vrai, faux])\n",
+        f"si {n} dans la [1, 2]: passer\n",
+    ])
+
+
+PROFILES = {
+    "dense": _dense,
+    "sparse": _sparse,
+    "strings": _strings,
+    "accents": _accents,
+    "multiword": _multiword,
+}
+
+
+def generate(profile, size, seed=0):
+    # Corpus déterministe d'environ size octets (UTF-8), en lignes entières.
+    rng = random.Random(f"{profile}:{size}:{seed}")
+    make_line = PROFILES[profile]
+    lines = []
+    total = 0
+    n = 1
+    while total < size:
+        line = make_line(rng, n)
+        lines.append(line)
+        total += len(line.encode("utf-8"))
+        n += 1
+    return "".join(lines)
+
+
+def _best_time(function, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure(profile, size, repeat, python_phases_limit):
+    vocabulary = get_vocabulary()
+    source = generate(profile, size)
+    nbytes = len(source.encode("utf-8"))
+    repeat = repeat if size <= (1 << 20) else 1
+    translate_s, python_source = _best_time(lambda: vocabulary.translate(source), repeat)
+
+    tracemalloc.start()
+    vocabulary.translate(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "bytes": nbytes,
+        "translate_s": translate_s,
+        "translate_mb_s": nbytes / translate_s / (1 << 20) if translate_s else 0.0,
+        "translate_peak_mb": peak / (1 << 20),
+    }
+    if size <= python_phases_limit:
+        parse_s, _ = _best_time(lambda: ast.parse(python_source), repeat)
+        compile_s, _ = _best_time(lambda: compile(python_source, "<bench>", "exec"), repeat)
+        result["parse_s"] = parse_s
+        result["compile_s"] = compile_s
+    return result
+
+
+def format_size(size):
+    for unit, scale in (("Mo", 1 << 20), ("Ko", 1 << 10)):
+        if size >= scale:
+            return f"{size // scale} {unit}"
+    return f"{size} o"
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if not reference:
+            continue
+        for metric in ("translate_s", "parse_s", "compile_s", "translate_peak_mb"):
+            if metric not in result or metric not in reference or not reference[metric]:
+                continue
+            ratio = result[metric] / reference[metric]
+            if ratio > 1 + threshold:
+                regressions.append((key, metric, reference[metric], result[metric], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure les performances du compilateur frenpy.")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=sorted(PROFILES))
+    parser.add_argument("--sizes", nargs="+", type=int, help="tailles des corpus en octets")
+    parser.add_argument("--quick", action="store_true", help="corpus jusqu'à 1 Mo seulement")
+    parser.add_argument("--repeat", type=int, default=5, help="répétitions (la meilleure est gardée)")
+    parser.add_argument("--python-phases-limit", type=int, default=DEFAULT_PYTHON_PHASES_LIMIT,
+                        help="taille maximale pour mesurer ast.parse et compile()")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="fichier JSON de référence")
+    parser.add_argument("--save", action="store_true", help="enregistrer les résultats comme référence")
+    parser.add_argument("--threshold", type=float, default=0.2, help="ralentissement toléré (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    results = {}
+    print(f"{'corpus':<22}{'Mo/s':>10}{'traduire':>12}{'ast.parse':>12}{'compile':>12}{'pic':>10}")
+    for profile in args.profiles:
+        for size in sizes:
+            key = f"{profile}/{size}"
+            result = measure(profile, size, args.repeat, args.python_phases_limit)
+            results[key] = result
+            parse = f"{result['parse_s'] * 1000:.1f} ms" if "parse_s" in result else "-"
+            compiled = f"{result['compile_s'] * 1000:.1f} ms" if "compile_s" in result else "-"
+            print(f"{profile + ' ' + format_size(size):<22}{result['translate_mb_s']:>10.2f}"
+                  f"{result['translate_s'] * 1000:>9.1f} ms{parse:>12}{compiled:>12}"
+                  f"{result['translate_peak_mb']:>7.1f} Mo")
+
+    status = 0
+    if not os.path.exists(args.baseline) and not args.save:
+        # Sans référence, rien n'est comparé : ce n'est pas un succès.
+        print(f"Aucune référence : {args.baseline} (--save pour l'enregistrer)")
+        status = 1
+    elif not args.save:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("machine") != platform.platform() or baseline.get("python") != platform.python_version():
+            print(f"Référence mesurée sur {baseline.get('machine')} (Python {baseline.get('python')}) : "
+                  f"les écarts peuvent venir de la machine.")
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, before, after, ratio in regressions:
+            print(f"Régression : {key} {metric} {before:.4g} -> {after:.4g} (x{ratio:.2f})")
+        if regressions:
+            status = 1
+        else:
+            print("Aucune régression par rapport à la référence.")
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "results": results,
+            }, file, indent=4)
+        print(f"Référence enregistrée : {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
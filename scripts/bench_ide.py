@@ -0,0 +1,284 @@
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPTS_DIR, "..", "python", "Lib", "site-packages"))
+from bench_compiler import PROFILES
+
+# Référence versionnée avec le dépôt, enregistrée par --save (tailles par
+# défaut) ; la plateforme et la version de Python y sont notées. À
+# réenregistrer après une accélération voulue ou sur une autre machine de
+# référence.
+DEFAULT_BASELINE = os.path.join(SCRIPTS_DIR, "..", "data", "bench_ide.json")
+DEFAULT_LINES = [1000, 10000, 100000, 500000]
+QUICK_LINES = [1000, 10000]
+DEFAULT_KEYS = 300
+DEFAULT_SCROLLS = 100
+# Les mesures plus rapides que cela tiennent du bruit et ne sont pas
+# comparées à la référence.
+NOISE_FLOOR_S = 0.0005
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Octets sous macOS, kilo-octets ailleurs.
+        return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / (1 << 20)
+    return None
+
+
+def generate_lines(profile, count, seed=0):
+    # Document déterministe d'exactement count lignes.
+    rng = random.Random(f"{profile}:{count}:{seed}")
+    make_line = PROFILES[profile]
+    lines = []
+    n = 1
+    while len(lines) < count:
+        lines.extend(make_line(rng, n).splitlines())
+        n += 1
+    return "\n".join(lines[:count]) + "\n"
+
+
+def distribution(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def percentile(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+    return {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99), "max": samples[-1]}
+
+
+def run_one(profile, lines, keys, scrolls):
+    # Exécuté dans un processus à part, pour que le pic de mémoire ne mesure
+    # que ce scénario.
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt, QPoint, QPointF
+    from PyQt6.QtGui import QWheelEvent
+    from PyQt6.QtTest import QTest
+    app = QApplication([])
+    import frenpy_ide
+
+    ide = frenpy_ide.FrenpyIDE()
+    ide.resize(1200, 800)
+    ide.show()
+    app.processEvents()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"bench_{profile}_{lines}.frenpy")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(generate_lines(profile, lines))
+        result = {"bytes": os.path.getsize(path)}
+
+        gc.collect()
+        start = time.perf_counter()
+        ide.open_path(path)
+        while ide.file_loader is not None:
+            app.processEvents()
+        editor = ide.tab_widget.currentWidget()
+        result["open_s"] = time.perf_counter() - start
+        result["mode"] = type(editor).__name__
+        if not isinstance(editor, frenpy_ide.CodeEditor):
+            result["peak_rss_mb"] = peak_rss_mb()
+            return result
+
+        highlighter = editor.highlighter
+        if isinstance(highlighter, frenpy_ide.BackgroundHighlighter):
+            while highlighter.done < editor.document().blockCount():
+                app.processEvents()
+        else:
+            app.processEvents()
+        result["highlight_s"] = time.perf_counter() - start
+
+        # Frappes au milieu du document, dessin compris.
+        cursor = editor.textCursor()
+        cursor.setPosition(editor.document().findBlockByNumber(lines // 2).position())
+        editor.setTextCursor(cursor)
+        editor.setFocus()
+        viewport = editor.viewport()
+        samples = []
+        for i in range(keys):
+            key = Qt.Key.Key_Return if i % 40 == 39 else Qt.Key.Key_A
+            start = time.perf_counter()
+            QTest.keyClick(editor, key)
+            viewport.repaint()
+            samples.append(time.perf_counter() - start)
+            app.processEvents()
+        result["typing"] = distribution(samples)
+        result["typing_handler"] = distribution(editor.key_latencies)
+
+        # Molette, dessin compris.
+        center = QPointF(viewport.width() / 2, viewport.height() / 2)
+        samples = []
+        for i in range(scrolls):
+            delta = -120 if (i // 25) % 2 == 0 else 120
+            event = QWheelEvent(center, viewport.mapToGlobal(center), QPoint(), QPoint(0, delta),
+                                Qt.MouseButton.NoButton, Qt.KeyboardModifier.NoModifier,
+                                Qt.ScrollPhase.NoScrollPhase, False)
+            start = time.perf_counter()
+            QApplication.sendEvent(viewport, event)
+            viewport.repaint()
+            samples.append(time.perf_counter() - start)
+            app.processEvents()
+        result["scrolling"] = distribution(samples)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def measure(profile, lines, keys, scrolls):
+    command = [sys.executable, os.path.abspath(__file__), "--run-one", profile, str(lines),
+               "--keys", str(keys), "--scrolls", str(scrolls)]
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "échec")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def metrics(result):
+    # Mesures comparables (plus petit = mieux), à plat.
+    flat = {}
+    for name in ("open_s", "highlight_s", "peak_rss_mb"):
+        if result.get(name) is not None:
+            flat[name] = result[name]
+    for group in ("typing", "typing_handler", "scrolling"):
+        for name, value in result.get(group, {}).items():
+            flat[f"{group}.{name}"] = value
+    return flat
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if not reference:
+            continue
+        before = metrics(reference)
+        for metric, value in metrics(result).items():
+            if metric.endswith(".max") or not before.get(metric):
+                continue
+            if not metric.endswith("_mb") and max(value, before[metric]) < NOISE_FLOOR_S:
+                continue
+            ratio = value / before[metric]
+            if ratio > 1 + threshold:
+                regressions.append((key, metric, before[metric], value, ratio))
+    return regressions
+
+
+def _ms(distribution, name="p50"):
+    return f"{distribution[name] * 1000:.2f}" if distribution else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure la réactivité de l'éditeur frenpy, sans affichage.")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=["dense"])
+    parser.add_argument("--lines", nargs="+", type=int, help="tailles des documents en lignes")
+    parser.add_argument("--quick", action="store_true", help="documents jusqu'à 10 000 lignes seulement")
+    parser.add_argument("--keys", type=int, default=DEFAULT_KEYS, help="frappes par document")
+    parser.add_argument("--scrolls", type=int, default=DEFAULT_SCROLLS, help="crans de molette par document")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="fichier JSON de référence")
+    parser.add_argument("--save", action="store_true", help="enregistrer les résultats comme référence")
+    parser.add_argument("--threshold", type=float, default=0.3, help="ralentissement toléré (0.3 = 30 %%)")
+    parser.add_argument("--run-one", nargs=2, metavar=("PROFIL", "LIGNES"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        profile, lines = args.run_one
+        print(json.dumps(run_one(profile, int(lines), args.keys, args.scrolls)))
+        return 0
+
+    sizes = args.lines or (QUICK_LINES if args.quick else DEFAULT_LINES)
+    results = {}
+    failures = []
+    print(f"{'document':<20}{'ouverture':>12}{'coloration':>12}{'frappe p50':>12}{'p99':>9}"
+          f"{'molette p50':>13}{'p99':>9}{'pic':>10}")
+    for profile in args.profiles:
+        for lines in sizes:
+            key = f"{profile}/{lines}"
+            try:
+                result = measure(profile, lines, args.keys, args.scrolls)
+            except RuntimeError as error:
+                print(f"{key:<20}erreur : {error}")
+                failures.append(key)
+                continue
+            results[key] = result
+            highlight = f"{result['highlight_s']:.3f} s" if "highlight_s" in result else result["mode"]
+            peak = f"{result['peak_rss_mb']:.0f} Mo" if result.get("peak_rss_mb") is not None else "-"
+            typing = result.get("typing", {})
+            scrolling = result.get("scrolling", {})
+            print(f"{key:<20}{result['open_s']:>10.3f} s{highlight:>12}{_ms(typing):>9} ms{_ms(typing, 'p99'):>9}"
+                  f"{_ms(scrolling):>10} ms{_ms(scrolling, 'p99'):>9}{peak:>10}")
+
+    status = 0
+    if failures:
+        # Un scénario qui échoue est un échec du banc, pas une mesure en moins.
+        print(f"Scénarios en échec : {', '.join(failures)}")
+        status = 1
+    if not os.path.exists(args.baseline) and not args.save:
+        # Sans référence, rien n'est comparé : ce n'est pas un succès.
+        print(f"Aucune référence : {args.baseline} (--save pour l'enregistrer)")
+        status = 1
+    elif not args.save:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("machine") != platform.platform() or baseline.get("python") != platform.python_version():
+            print(f"Référence mesurée sur {baseline.get('machine')} (Python {baseline.get('python')}) : "
+                  f"les écarts peuvent venir de la machine.")
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, before, after, ratio in regressions:
+            print(f"Régression : {key} {metric} {before:.4g} -> {after:.4g} (x{ratio:.2f})")
+        if regressions:
+            status = 1
+        elif not failures:
+            print("Aucune régression par rapport à la référence.")
+    if args.save and failures:
+        print("Référence non enregistrée : des scénarios ont échoué.")
+    elif args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "results": results,
+            }, file, indent=4)
+        print(f"Référence enregistrée : {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,54 +1,400 @@
 import sys
 import zipfile
 import os
-import tempfile
 import threading
+import time
+import mmap
+import bisect
+import io
+import codecs
+import queue
+import json
+from collections import deque
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QPlainTextEdit, QFileDialog, QVBoxLayout, QWidget,
     QMenuBar, QMessageBox, QPushButton, QHBoxLayout, QPlainTextEdit, QLabel,
-    QTreeView, QSplitter, QCompleter, QListView, QFrame, QScrollBar, QTextEdit, QTabWidget, QTabBar
+    QTreeView, QSplitter, QCompleter, QListView, QFrame, QScrollBar, QTextEdit, QTabWidget, QTabBar, QLineEdit, QProgressBar,
+    QTableWidget, QTableWidgetItem, QAbstractItemView
 )
-from PyQt6.QtGui import QIcon, QAction, QFileSystemModel, QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QPainter, QTextFormat
-from PyQt6.QtCore import Qt, QDir, QRegularExpression, QStringListModel, QRect, QSize, QProcess, QThread, pyqtSignal, QEvent
-from frenpy import load, compile_frenpy, get_words_frenpy
+from PyQt6.QtGui import QIcon, QAction, QFileSystemModel, QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QPainter, QTextFormat, QTextCursor, QTextLayout, QIntValidator
+from PyQt6.QtCore import Qt, QDir, QStringListModel, QRect, QSize, QProcess, QThread, pyqtSignal, QEvent, QFileSystemWatcher, QObject, QTimer
+from frenpy import load, compile_frenpy, compile_frenpy_source, get_words_frenpy
+from frenpy.incremental import IncrementalCompiler
+from frenpy.vocabulary import get_vocabulary, set_workspace, vocabulary_layers
+from frenpy.lexer import KEYWORD, STRING, COMMENT, STATES
+from frenpy.completion import CompletionIndex
+from frenpy.host import END_MARKER, FALLBACK, UNAVAILABLE
+from frenpy.limits import CPU_EXIT_CODE, MEMORY_EXIT_CODE, WINDOWS_CPU_EXIT_CODE
+from frenpy.profiler import PROFILE_MARKER
+
+# Au-delà, la coloration se fait en tâche de fond (BackgroundHighlighter).
+LARGE_DOCUMENT_LINES = 20000
+HIGHLIGHT_SLICE = 0.008
+# Au-delà, les fichiers s'ouvrent en lecture seule dans LargeFileViewer.
+LARGE_FILE_BYTES = 32 << 20
+PAGE_BYTES = 256 << 10
+LINE_INDEX_CHUNK = 1 << 20
+SCROLL_STEPS = 1 << 20
+# Taille des morceaux de texte envoyés à l'éditeur pendant un chargement.
+LOAD_CHUNK_CHARS = 1 << 15
+# Frappes gardées pour les percentiles de latence de l'éditeur.
+KEY_LATENCY_SAMPLES = 1000
+# Complétion proposée à partir de ce nombre de caractères.
+COMPLETION_MIN_PREFIX = 2
+COMPLETION_LIMIT = 20
+# Console : lignes gardées (clé "console_scrollback" de data/config.json),
+# lignes en attente entre deux rafraîchissements et intervalle entre eux.
+CONSOLE_SCROLLBACK = 10000
+CONSOLE_PENDING_LINES = 20000
+CONSOLE_FLUSH_MS = 16
+# Scripts exécutés en même temps (clé "max_running_scripts" de
+# data/config.json) ; les suivants attendent leur tour.
+MAX_RUNNING_SCRIPTS = 3
+# Interpréteurs lancés d'avance (clé "warm_interpreters") : "Run Script" en
+# prend un qui a déjà démarré et importé frenpy.
+WARM_INTERPRETERS = 2
+PYTHON_EXE = os.path.join("..", "python", "python.exe")
+# Exécution dans un sous-interpréteur du processus "frenpy host" (clé
+# "subinterpreter_runs", modifiable dans le menu Tools).
+SUBINTERPRETER_RUNS = False
+# Limites par exécution (clé "run_limits"), 0 = sans limite. Temps CPU et
+# mémoire sont appliqués par le processus du script lui-même, durée et
+# volume de sortie par le chien de garde de ScriptRunner.
+RUN_LIMITS = {"cpu_seconds": 300, "memory_mb": 2048, "timeout_seconds": 0, "output_mb": 100}
+LIMIT_NAMES = {
+    "cpu_seconds": "temps CPU",
+    "memory_mb": "mémoire",
+    "timeout_seconds": "durée",
+    "output_mb": "volume de sortie",
+}
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "config.json")
+
+def highlight_formats():
+    keyword_format = QTextCharFormat()
+    keyword_format.setForeground(QColor("white"))
+    keyword_format.setFontWeight(QFont.Weight.Bold)
+    string_format = QTextCharFormat()
+    string_format.setForeground(QColor("lightblue"))
+    comment_format = QTextCharFormat()
+    comment_format.setForeground(QColor("green"))
+    return {KEYWORD: keyword_format, STRING: string_format, COMMENT: comment_format}
 
 class PythonHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent=None):
+    # Un seul passage par ligne, avec le lexer du vocabulaire courant ; l'état
+    # du bloc garde le littéral resté ouvert (chaînes sur plusieurs lignes).
+    def __init__(self, parent=None, vocabulary=None):
         super().__init__(parent)
-        self.highlighting_rules = []
-
-        # Keywords
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("white"))
-        keyword_format.setFontWeight(QFont.Weight.Bold)
-        keywords = [
-            "importer", "afficher", "si", "sinon", "répéter à l'infini", "arrondir", "nouvelle_écran", "stopper", "attendre", 
-            "saisir", "dans la", "frpy_scc=True", "frpy_debug=True", "frpy_debug=False", "retourner", "et", "ou", "non", 
-            "vrai", "faux", "pour", "tant que", "essayer", "except", "avec", "classe", "importer comme", "depuis", "lever", 
-            "continuer", "passer", "supprimer", "global", "lambda", "assurer", "ranger", "longueur", "ouvrir", "liste", 
-            "dictionnaire", "ensemble", "tuple", "enumerer", "toutes", "n'importe lequel", "plage", "type"
-        ]
-
-        for keyword in keywords:
-            pattern = QRegularExpression(f"\\b{keyword}\\b")
-            self.highlighting_rules.append((pattern, keyword_format))
-
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("lightblue"))
-        self.highlighting_rules.append((QRegularExpression(r'"[^"\\]*(\\.[^"\\]*)*"'), string_format))
-        self.highlighting_rules.append((QRegularExpression(r"'[^'\\]*(\\.[^'\\]*)*'"), string_format))
-
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("green"))
-        self.highlighting_rules.append((QRegularExpression(r"#.*"), comment_format))
+        self.formats = highlight_formats()
+        self.lexer = (vocabulary or get_vocabulary()).lexer
+
+    def set_vocabulary(self, vocabulary):
+        self.lexer = vocabulary.lexer
+        self.rehighlight()
 
     def highlightBlock(self, text):
-        for pattern, format in self.highlighting_rules:
-            expression = QRegularExpression(pattern)
-            match_iterator = expression.globalMatch(text)
-            while match_iterator.hasNext():
-                match = match_iterator.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), format)
+        previous = self.previousBlockState()
+        spans, state = self.lexer.highlight(text, STATES[previous] if previous > 0 else "")
+        formats = self.formats
+        for start, length, kind in spans:
+            self.setFormat(start, length, formats[kind])
+        self.setCurrentBlockState(STATES.index(state))
+
+class BackgroundHighlighter(QObject):
+    # Coloration des gros documents sans bloquer l'interface : les lignes
+    # visibles d'abord, puis le reste par tranches de HIGHLIGHT_SLICE depuis
+    # la boucle d'événements. states[i] est le littéral ouvert au début de la
+    # ligne i, connu pour les lignes 0 à done ; au-delà, les lignes visibles
+    # sont colorées en supposant qu'aucun littéral n'est ouvert, puis
+    # corrigées quand la passe de fond les atteint.
+    def __init__(self, editor, vocabulary=None):
+        super().__init__(editor)
+        self.editor = editor
+        self.document = editor.document()
+        self.formats = highlight_formats()
+        self.lexer = (vocabulary or get_vocabulary()).lexer
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.work)
+        self.document.contentsChange.connect(self.update_blocks)
+        editor.updateRequest.connect(self.schedule)
+        self.reset()
+
+    def reset(self):
+        self.states = [""]
+        self.done = 0
+        self.guessed = set()
+        self.block_count = self.document.blockCount()
+        self.schedule()
+
+    def set_vocabulary(self, vocabulary):
+        self.lexer = vocabulary.lexer
+        self.reset()
+
+    def detach(self):
+        self.timer.stop()
+        self.document.contentsChange.disconnect(self.update_blocks)
+        self.editor.updateRequest.disconnect(self.schedule)
+        self.deleteLater()
+
+    def schedule(self, *_):
+        if not self.timer.isActive():
+            self.timer.start(0)
+
+    def paint(self, block, spans):
+        formats = self.formats
+        ranges = []
+        for start, length, kind in spans:
+            format_range = QTextLayout.FormatRange()
+            format_range.start = start
+            format_range.length = length
+            format_range.format = formats[kind]
+            ranges.append(format_range)
+        block.layout().setFormats(ranges)
+        self.document.markContentsDirty(block.position(), block.length())
+
+    def visible_blocks(self):
+        editor = self.editor
+        block = editor.firstVisibleBlock()
+        offset = editor.contentOffset()
+        bottom = editor.viewport().height()
+        while block.isValid() and editor.blockBoundingGeometry(block).translated(offset).top() <= bottom:
+            yield block
+            block = block.next()
+
+    def work(self):
+        deadline = time.perf_counter() + HIGHLIGHT_SLICE
+        highlight = self.lexer.highlight
+        # Une ligne visible hors de la partie déjà traitée est colorée sans
+        # attendre ; si l'utilisateur défile, seules les nouvelles lignes
+        # visibles comptent.
+        for block in self.visible_blocks():
+            number = block.blockNumber()
+            if number >= self.done and number not in self.guessed:
+                self.paint(block, highlight(block.text())[0])
+                self.guessed.add(number)
+        states = self.states
+        block = self.document.findBlockByNumber(self.done)
+        while block.isValid():
+            spans, state = highlight(block.text(), states[self.done])
+            self.paint(block, spans)
+            states.append(state)
+            self.done += 1
+            block = block.next()
+            if time.perf_counter() > deadline:
+                break
+        self.guessed = {number for number in self.guessed if number >= self.done}
+        if block.isValid():
+            self.timer.start(0)
+
+    def update_blocks(self, position, removed, added):
+        # Les lignes modifiées sont recolorées tout de suite ; la suite ne
+        # l'est que si l'état en fin de modification a changé, dans la limite
+        # d'une tranche, après quoi la passe de fond reprend à cet endroit.
+        document = self.document
+        first = document.findBlock(position).blockNumber()
+        last = document.findBlock(min(position + added, document.characterCount() - 1)).blockNumber()
+        delta = document.blockCount() - self.block_count
+        self.block_count = document.blockCount()
+        self.guessed.clear()
+        if first >= self.done:
+            self.schedule()
+            return
+        states = self.states
+        if last - delta >= self.done:
+            del states[first + 1:]
+            self.done = first
+            self.schedule()
+            return
+        states[first + 1:last - delta + 1] = [""] * (last - first)
+        self.done += delta
+        deadline = time.perf_counter() + HIGHLIGHT_SLICE
+        highlight = self.lexer.highlight
+        block = document.findBlockByNumber(first)
+        number = first
+        while number < self.done:
+            spans, state = highlight(block.text(), states[number])
+            self.paint(block, spans)
+            number += 1
+            block = block.next()
+            if number > last and states[number] == state:
+                break
+            states[number] = state
+            if time.perf_counter() > deadline:
+                del states[number + 1:]
+                self.done = number
+                break
+        self.schedule()
+
+class MappedFile:
+    # Fichier projeté en mémoire en lecture seule. Seul un index clairsemé
+    # des lignes est gardé : lines[i] est le nombre de "\n" avant l'octet
+    # i * LINE_INDEX_CHUNK, calculé à la demande.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self.map)
+        self.lines = [0]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def _index_to(self, chunk):
+        lines = self.lines
+        last_chunk = (self.size - 1) // LINE_INDEX_CHUNK + 1
+        while len(lines) <= min(chunk, last_chunk):
+            start = (len(lines) - 1) * LINE_INDEX_CHUNK
+            lines.append(lines[-1] + self.map[start:start + LINE_INDEX_CHUNK].count(b"\n"))
+
+    def line_at(self, offset):
+        # Numéro (à partir de 0) de la ligne qui contient offset.
+        chunk = offset // LINE_INDEX_CHUNK
+        self._index_to(chunk)
+        return self.lines[chunk] + self.map[chunk * LINE_INDEX_CHUNK:offset].count(b"\n")
+
+    def skip_lines(self, offset, count):
+        for _ in range(count):
+            newline = self.map.find(b"\n", offset)
+            if newline == -1:
+                return self.line_start(self.size)
+            offset = newline + 1
+        return offset
+
+    def line_offset(self, line):
+        # Début de la ligne line (à partir de 0), ou de la dernière ligne.
+        lines = self.lines
+        self._index_to(1)
+        while lines[-1] < line and (len(lines) - 1) * LINE_INDEX_CHUNK < self.size:
+            self._index_to(len(lines))
+        chunk = max(0, bisect.bisect_left(lines, line) - 1)
+        return self.skip_lines(chunk * LINE_INDEX_CHUNK, line - lines[chunk])
+
+    def line_start(self, offset):
+        return self.map.rfind(b"\n", 0, offset) + 1
+
+    def page(self, offset):
+        # Lignes entières couvrant environ PAGE_BYTES à partir de offset.
+        start = self.line_start(min(offset, self.size))
+        end = self.map.find(b"\n", min(start + PAGE_BYTES, self.size))
+        return start, self.size if end == -1 else end + 1
+
+class LargeFileViewer(QWidget):
+    # Mode gros fichiers, en lecture seule : seule la page autour de la
+    # position affichée est décodée et confiée au QPlainTextEdit ; la barre
+    # de défilement de droite couvre le fichier entier.
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.mapped = MappedFile(file_path)
+        self.page_start = self.page_end = 0
+        self.search_from = 0
+        self.moving = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        tools = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Rechercher")
+        self.search_input.returnPressed.connect(self.find_next)
+        find_button = QPushButton("Suivant")
+        find_button.clicked.connect(self.find_next)
+        self.line_input = QLineEdit()
+        self.line_input.setPlaceholderText("Aller à la ligne")
+        self.line_input.setValidator(QIntValidator(1, 2 ** 31 - 1))
+        self.line_input.returnPressed.connect(self.goto_line)
+        self.position_label = QLabel()
+        tools.addWidget(self.search_input)
+        tools.addWidget(find_button)
+        tools.addWidget(self.line_input)
+        tools.addWidget(self.position_label)
+        layout.addLayout(tools)
+
+        body = QHBoxLayout()
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.view.verticalScrollBar().valueChanged.connect(self.on_view_scrolled)
+        self.scrollbar = QScrollBar(Qt.Orientation.Vertical)
+        self.scrollbar.setRange(0, SCROLL_STEPS)
+        self.scrollbar.setPageStep(max(1, SCROLL_STEPS * PAGE_BYTES // max(1, self.mapped.size)))
+        self.scrollbar.valueChanged.connect(self.on_scrollbar_moved)
+        body.addWidget(self.view)
+        body.addWidget(self.scrollbar)
+        layout.addLayout(body)
+        self.show_offset(0)
+
+    def close_file(self):
+        self.mapped.close()
+
+    def show_offset(self, offset, length=0):
+        # Affiche la page qui entoure offset, avec sa ligne en haut de la vue ;
+        # length octets à partir de offset sont sélectionnés.
+        mapped = self.mapped
+        top = mapped.line_start(offset)
+        start, end = mapped.page(max(0, top - PAGE_BYTES // 2))
+        self.moving = True
+        if (start, end) != (self.page_start, self.page_end):
+            self.view.setPlainText(mapped.map[start:end].decode("utf-8", "replace"))
+            self.page_start, self.page_end = start, end
+        top_line = mapped.map[start:top].count(b"\n")
+        self.view.verticalScrollBar().setValue(top_line)
+        if length:
+            block = self.view.document().findBlockByNumber(top_line)
+            column = len(mapped.map[top:offset].decode("utf-8", "replace"))
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + column)
+            cursor.setPosition(cursor.position() + len(mapped.map[offset:offset + length].decode("utf-8", "replace")),
+                               QTextCursor.MoveMode.KeepAnchor)
+            self.view.setTextCursor(cursor)
+        self.moving = False
+        self.show_position(top)
+
+    def show_position(self, offset):
+        size = max(1, self.mapped.size)
+        self.scrollbar.blockSignals(True)
+        self.scrollbar.setValue(offset * SCROLL_STEPS // size)
+        self.scrollbar.blockSignals(False)
+        self.position_label.setText(f"Ligne {self.mapped.line_at(offset) + 1}")
+
+    def visible_offset(self):
+        block = self.view.firstVisibleBlock()
+        return self.mapped.skip_lines(self.page_start, block.blockNumber())
+
+    def on_view_scrolled(self, value):
+        # En approchant d'un bord de la page, la page suivante ou précédente
+        # est chargée autour de la ligne affichée.
+        if self.moving:
+            return
+        bar = self.view.verticalScrollBar()
+        margin = bar.pageStep()
+        offset = self.visible_offset()
+        if (value <= margin and self.page_start > 0) or (value >= bar.maximum() - margin and self.page_end < self.mapped.size):
+            self.show_offset(offset)
+        else:
+            self.show_position(offset)
+
+    def on_scrollbar_moved(self, value):
+        self.show_offset(value * self.mapped.size // SCROLL_STEPS)
+
+    def find_next(self):
+        pattern = self.search_input.text().encode("utf-8")
+        if not pattern:
+            return
+        found = self.mapped.map.find(pattern, self.search_from)
+        if found == -1:
+            found = self.mapped.map.find(pattern, 0)
+        if found == -1:
+            self.position_label.setText("Introuvable")
+            return
+        self.search_from = found + len(pattern)
+        self.show_offset(found, len(pattern))
+
+    def goto_line(self):
+        if self.line_input.text():
+            offset = self.mapped.line_offset(int(self.line_input.text()) - 1)
+            self.search_from = offset
+            self.show_offset(offset)
 
 class AutoCompleter(QCompleter):
     def __init__(self, keywords, parent=None):
@@ -69,28 +415,129 @@ class LineNumberArea(QWidget):
         self.code_editor.line_number_area_paint_event(event)
 
 class CodeEditor(QPlainTextEdit):
+    compiled_changed = pyqtSignal(int, int, list)
+    # Émis seulement quand le document passe de enregistré à modifié, ou
+    # l'inverse, et non à chaque frappe.
+    dirty_changed = pyqtSignal(bool)
+    # Même plage que compiled_changed, avec les lignes sources.
+    lines_changed = pyqtSignal(int, int, list)
+
     def __init__(self):
         super().__init__()
         self.line_number_area = LineNumberArea(self)
+        self.compiler_session = IncrementalCompiler()
+        self.highlighter = PythonHighlighter(self.document(), self.compiler_session.vocabulary)
+        self.large_document = False
+        self.gutter_digits = 0
+        self.gutter_width = 0
+        self.current_line = QTextEdit.ExtraSelection()
+        line_color = QColor(Qt.GlobalColor.white)
+        line_color.setAlphaF(0.1)
+        self.current_line.format.setBackground(line_color)
+        self.current_line.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+        self.current_line_shown = False
+        self.key_latencies = deque(maxlen=KEY_LATENCY_SAMPLES)
+        self.completer = None
+        # Numéro de ligne -> part du temps (0 à 1) du dernier profil.
+        self.line_heat = {}
         self.blockCountChanged.connect(self.update_line_number_area_width)
+        self.blockCountChanged.connect(self.clear_line_heat)
         self.updateRequest.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self.highlight_current_line)
-        self.textChanged.connect(self.mark_modified)
+        self.document().modificationChanged.connect(self.on_modification_changed)
+        self.document().contentsChange.connect(self.update_compiled)
         self.update_line_number_area_width(0)
         self.highlight_current_line()
         self.file_path = None
 
+    def on_modification_changed(self, dirty):
+        # Un éditeur en lecture seule est en cours de chargement.
+        if not self.isReadOnly():
+            self.dirty_changed.emit(dirty)
+
+    def update_compiled(self, position, removed, added):
+        # Seules les lignes touchées sont retraduites ; compiled_changed donne
+        # la plage du code compilé à remplacer.
+        document = self.document()
+        block = document.findBlock(position)
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(min(position + added, document.characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+        inserted = cursor.selectedText().replace("\u2029", "\n")
+        session = self.compiler_session
+        old_count = len(session.lines)
+        first, count, lines = session.apply_change((block.blockNumber(), position - block.position()), removed, inserted)
+        if session.length != document.characterCount() - 1:
+            session.reset(self.toPlainText())
+            first, count, lines = 0, old_count, session.compiled
+        self.compiled_changed.emit(first, count, lines)
+        self.lines_changed.emit(first, count, session.lines[first:first + len(lines)])
+
+    def setPlainText(self, text):
+        # QSyntaxHighlighter colore tout le document d'un coup : au-delà de
+        # LARGE_DOCUMENT_LINES lignes, BackgroundHighlighter prend le relais.
+        large = text.count("\n") >= LARGE_DOCUMENT_LINES
+        if self.large_document and not large:
+            self.highlighter.detach()
+            super().setPlainText(text)
+            self.highlighter = PythonHighlighter(self.document(), self.compiler_session.vocabulary)
+            self.large_document = False
+            return
+        self.use_background_highlighter(large)
+        if large:
+            self.highlighter.reset()
+        super().setPlainText(text)
+
+    def use_background_highlighter(self, large):
+        if large and not self.large_document:
+            self.highlighter.setDocument(None)
+            self.highlighter.deleteLater()
+            self.highlighter = BackgroundHighlighter(self, self.compiler_session.vocabulary)
+            self.large_document = True
+
+    def begin_load(self):
+        # Le contenu arrive par morceaux (FileLoader) : pas de saisie ni
+        # d'historique d'annulation avant la fin du chargement.
+        self.setReadOnly(True)
+        self.document().setUndoRedoEnabled(False)
+
+    def append_chunk(self, text):
+        if not self.large_document and self.blockCount() + text.count("\n") >= LARGE_DOCUMENT_LINES:
+            self.use_background_highlighter(True)
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+
+    def end_load(self):
+        self.document().setUndoRedoEnabled(True)
+        self.document().setModified(False)
+        self.setReadOnly(False)
+        self.highlight_current_line()
+
+    def set_vocabulary(self, vocabulary):
+        self.highlighter.set_vocabulary(vocabulary)
+        for first, count, lines in self.compiler_session.set_vocabulary(vocabulary):
+            self.compiled_changed.emit(first, count, lines)
+
     def line_number_area_width(self):
-        digits = 1
-        max_block = max(1, self.blockCount())
-        while max_block >= 10:
-            max_block //= 10
-            digits += 1
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
-        return space
+        return self.gutter_width
 
-    def update_line_number_area_width(self, _):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+    def update_line_number_area_width(self, _=0, force=False):
+        # La largeur de la marge ne change qu'avec le nombre de chiffres du
+        # dernier numéro de ligne, ou avec la police.
+        digits = len(str(max(1, self.blockCount())))
+        if digits == self.gutter_digits and not force:
+            return
+        self.gutter_digits = digits
+        self.gutter_width = 3 + self.fontMetrics().horizontalAdvance('9') * digits
+        self.setViewportMargins(self.gutter_width, 0, 0, 0)
+        cr = self.contentsRect()
+        self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.gutter_width, cr.height()))
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            self.update_line_number_area_width(force=True)
 
     def update_line_number_area(self, rect, dy):
         if dy:
@@ -105,6 +552,15 @@ class CodeEditor(QPlainTextEdit):
         cr = self.contentsRect()
         self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.line_number_area_width(), cr.height()))
 
+    def set_line_heat(self, heat):
+        self.line_heat = heat
+        self.line_number_area.update()
+
+    def clear_line_heat(self, _=0):
+        # Une ligne ajoutée ou supprimée décale les numéros du profil.
+        if self.line_heat:
+            self.set_line_heat({})
+
     def line_number_area_paint_event(self, event):
         painter = QPainter(self.line_number_area)
         painter.fillRect(event.rect(), Qt.GlobalColor.lightGray)
@@ -112,9 +568,12 @@ class CodeEditor(QPlainTextEdit):
         block_number = block.blockNumber()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
         bottom = top + int(self.blockBoundingRect(block).height())
+        heat = self.line_heat
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
                 number = str(block_number + 1)
+                if block_number + 1 in heat:
+                    painter.fillRect(0, top, 3, bottom - top, QColor(220, 50, 30, int(40 + 215 * heat[block_number + 1])))
                 painter.setPen(Qt.GlobalColor.black)
                 painter.drawText(0, top, self.line_number_area.width(), self.fontMetrics().height(),
                                  Qt.AlignmentFlag.AlignRight, number)
@@ -124,19 +583,44 @@ class CodeEditor(QPlainTextEdit):
             block_number += 1
 
     def highlight_current_line(self):
-        extra_selections = []
-        if not self.isReadOnly():
-            selection = QTextEdit.ExtraSelection()
-            line_color = QColor(Qt.GlobalColor.white)
-            line_color.setAlphaF(0.1)
-            selection.format.setBackground(line_color)
-            selection.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
-            selection.cursor = self.textCursor()
-            selection.cursor.clearSelection()
-            extra_selections.append(selection)
-        self.setExtraSelections(extra_selections)
+        # La même sélection est réutilisée, et reposée seulement quand le
+        # curseur change de ligne.
+        if self.isReadOnly():
+            if self.current_line_shown:
+                self.setExtraSelections([])
+                self.current_line_shown = False
+            return
+        cursor = self.textCursor()
+        if self.current_line_shown and self.current_line.cursor.blockNumber() == cursor.blockNumber():
+            return
+        cursor.clearSelection()
+        self.current_line.cursor = cursor
+        self.setExtraSelections([self.current_line])
+        self.current_line_shown = True
 
     def keyPressEvent(self, event):
+        # Durée de traitement de chaque frappe, signaux synchrones compris
+        # (traduction, coloration) ; voir latency_summary().
+        start = time.perf_counter()
+        self.handle_key(event)
+        self.key_latencies.append(time.perf_counter() - start)
+
+    def latency_summary(self):
+        samples = sorted(self.key_latencies)
+        if not samples:
+            return "Latence de frappe : aucune frappe mesurée."
+        def percentile(fraction):
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000
+        return (f"Latence de frappe ({len(samples)} frappes) : p50 {percentile(0.5):.2f} ms, "
+                f"p90 {percentile(0.9):.2f} ms, p99 {percentile(0.99):.2f} ms, max {samples[-1] * 1000:.2f} ms")
+
+    def handle_key(self, event):
+        # Pendant que la liste de complétion est ouverte, ces touches lui
+        # reviennent.
+        if (self.completer and self.completer.popup().isVisible()
+                and event.key() in (Qt.Key.Key_Enter, Qt.Key.Key_Return, Qt.Key.Key_Escape, Qt.Key.Key_Tab, Qt.Key.Key_Backtab)):
+            event.ignore()
+            return
         if event.key() == Qt.Key.Key_Return:
             cursor = self.textCursor()
             cursor.movePosition(cursor.MoveOperation.StartOfLine, cursor.MoveMode.KeepAnchor)
@@ -161,58 +645,809 @@ class CodeEditor(QPlainTextEdit):
         else:
             super().keyPressEvent(event)
 
-    def mark_modified(self):
-        parent_widget = self.parentWidget()
-        if parent_widget:
-            main_window = parent_widget.parentWidget()
-            if main_window and hasattr(main_window, 'tab_widget'):
-                current_index = main_window.tab_widget.indexOf(self)
-                if current_index != -1:
-                    tab_text = main_window.tab_widget.tabText(current_index)
-                    if not tab_text.endswith('*'):
-                        main_window.tab_widget.setTabText(current_index, tab_text + '*')
-
-class ScriptRunner(QThread):
-    output_signal = pyqtSignal(str)
-    input_signal = pyqtSignal(str)
-    started_signal = pyqtSignal()
-    finished_signal = pyqtSignal()
+def detect_encoding(head):
+    # BOM d'abord ; sans BOM, UTF-8 si le début du fichier est valide (un
+    # caractère coupé en fin de head est toléré), sinon cp1252.
+    for bom, encoding in ((codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+                          (codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+                          (codecs.BOM_UTF16_BE, "utf-16")):
+        if head.startswith(bom):
+            return encoding
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as error:
+        if error.start < len(head) - 3:
+            return "cp1252"
+    return "utf-8"
+
+class FileLoader(QThread):
+    # Lit et décode un fichier hors du thread de l'interface. Le texte,
+    # avec des fins de ligne "\n", arrive par morceaux de LOAD_CHUNK_CHARS ;
+    # au plus deux morceaux attendent l'éditeur (chunk_done), pour que
+    # l'interface se redessine entre deux morceaux.
+    chunk_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(int)
+    loaded_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.cancelled = False
+        self.pending = threading.Semaphore(2)
 
-    def __init__(self, script_path):
+    def chunk_done(self):
+        self.pending.release()
+
+    def run(self):
+        try:
+            size = max(1, os.path.getsize(self.file_path))
+            with open(self.file_path, "rb", buffering=1 << 16) as raw:
+                encoding = detect_encoding(raw.peek(1 << 16)[:1 << 16])
+                text = io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline=None)
+                while not self.cancelled:
+                    chunk = text.read(LOAD_CHUNK_CHARS)
+                    if not chunk:
+                        break
+                    self.pending.acquire()
+                    self.chunk_signal.emit(chunk)
+                    self.progress_signal.emit(min(100, raw.tell() * 100 // size))
+        except OSError as error:
+            self.error_signal.emit(str(error))
+            return
+        if not self.cancelled:
+            self.loaded_signal.emit(encoding)
+
+    def cancel(self):
+        self.cancelled = True
+        self.pending.release()
+
+class CompletionWorker(QThread):
+    # Tient le CompletionIndex dans son propre thread. L'interface ne fait
+    # qu'envoyer des messages ; les mises à jour en attente sont appliquées
+    # dans l'ordre et seule la dernière requête reçoit une réponse.
+    results_signal = pyqtSignal(int, list)
+
+    def __init__(self, vocabulary):
         super().__init__()
-        self.script_path = script_path
-        self.process = None
+        self.vocabulary = vocabulary
+        self.requests = queue.Queue()
+
+    def post(self, *request):
+        self.requests.put(request)
+
+    def update_lines(self, document, first, count, lines):
+        self.post("update_lines", document, first, count, lines)
+
+    def remove_document(self, document):
+        self.post("remove_document", document)
+
+    def set_file(self, path, text):
+        self.post("set_file", path, text)
+
+    def scan_workspace(self, directory):
+        self.post("scan_workspace", directory)
+
+    def set_vocabulary(self, vocabulary):
+        self.post("set_vocabulary", vocabulary)
+
+    def touch(self, word):
+        self.post("touch", word)
+
+    def query(self, request, prefix):
+        self.post("query", request, prefix)
+
+    def stop(self):
+        self.post("stop")
+        self.wait()
 
     def run(self):
-        self.started_signal.emit()
-        self.process = QProcess()
-        self.process.setProgram(os.path.join("..", "python", "python.exe"))
-        self.process.setArguments([self.script_path])
+        index = CompletionIndex(self.vocabulary)
+        while True:
+            requests = [self.requests.get()]
+            while not self.requests.empty():
+                requests.append(self.requests.get())
+            query = None
+            for kind, *arguments in requests:
+                if kind == "stop":
+                    return
+                if kind == "query":
+                    query = arguments
+                else:
+                    getattr(index, kind)(*arguments)
+            if query:
+                self.results_signal.emit(query[0], index.complete(query[1], COMPLETION_LIMIT))
+            elif self.requests.empty():
+                # Au repos, les meilleurs mots de chaque préfixe touché par
+                # les mises à jour sont recalculés d'avance.
+                index.trie.top("")
+
+def read_config():
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+class ConsoleSink(QObject):
+    # Sortie des scripts vers la console. Le décodage UTF-8 est incrémental :
+    # un caractère coupé entre deux lectures reste entier. Les lignes
+    # attendent dans un tampon circulaire et sont écrites dans le widget au
+    # plus une fois par CONSOLE_FLUSH_MS ; si un script écrit plus vite, les
+    # plus anciennes sont abandonnées et comptées dans dropped.
+    def __init__(self, console, scrollback=CONSOLE_SCROLLBACK, pending_lines=CONSOLE_PENDING_LINES):
+        super().__init__(console)
+        self.console = console
+        console.setMaximumBlockCount(scrollback)
+        self.lines = deque(maxlen=pending_lines)
+        self.partial = ""
+        self.carriage = ""
+        self.dropped = 0
+        self.dropped_pending = 0
+        self.at_line_start = True
+        # Ce qui suit input_position dans la console est la saisie de
+        # l'utilisateur.
+        self.input_position = 0
+        # Début de l'exécution en cours, que rewind peut effacer.
+        self.mark = None
+        self.mark_at_line_start = True
+        console.document().contentsChange.connect(self.on_contents_change)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(CONSOLE_FLUSH_MS)
+        self.timer.timeout.connect(self.flush)
+        self.reset()
+
+    def reset(self):
+        # Au début d'une exécution : rien ne reste d'un caractère coupé.
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.carriage = ""
+
+    def set_mark(self):
+        self.flush()
+        self.mark = self.console.document().characterCount() - 1
+        self.mark_at_line_start = self.at_line_start
+
+    def on_contents_change(self, position, removed, added):
+        # Au-delà de scrollback, la console perd ses premières lignes : la
+        # marque recule d'autant.
+        if self.mark is not None and position < self.mark:
+            self.mark = max(position, self.mark - removed) + added
+
+    def rewind(self):
+        # Efface la sortie écrite depuis set_mark, y compris celle qui
+        # attend encore dans le tampon.
+        if self.mark is None:
+            return
+        self.timer.stop()
+        self.lines.clear()
+        self.partial = ""
+        self.dropped_pending = 0
+        self.reset()
+        document = self.console.document()
+        cursor = QTextCursor(document)
+        cursor.setPosition(min(self.mark, document.characterCount() - 1))
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self.at_line_start = self.mark_at_line_start
+        self.input_position = document.characterCount() - 1
+
+    def write(self, data):
+        self.write_text(self.decoder.decode(data))
+
+    def write_text(self, text):
+        text = self.carriage + text
+        self.carriage = ""
+        if text.endswith("\r"):
+            self.carriage = "\r"
+            text = text[:-1]
+        if not text:
+            return
+        lines = (self.partial + text.replace("\r\n", "\n")).split("\n")
+        self.partial = lines.pop()
+        overflow = len(self.lines) + len(lines) - self.lines.maxlen
+        if overflow > 0:
+            self.dropped += overflow
+            self.dropped_pending += overflow
+        self.lines.extend(lines)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def write_line(self, text):
+        # Message de l'IDE, toujours sur sa propre ligne.
+        if self.partial or (not self.lines and not self.at_line_start):
+            text = "\n" + text
+        self.write_text(text + "\n")
+
+    def flush(self):
+        self.timer.stop()
+        if not self.lines and not self.partial and not self.dropped_pending:
+            return
+        text = "".join(line + "\n" for line in self.lines) + self.partial
+        if self.dropped_pending:
+            text = f"[{self.dropped_pending} lignes ignorées, {self.dropped} au total]\n" + text
+            self.dropped_pending = 0
+        self.lines.clear()
+        self.partial = ""
+        document = self.console.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.at_line_start = text.endswith("\n")
+        self.input_position = document.characterCount() - 1
+        bar = self.console.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def input_text(self):
+        cursor = QTextCursor(self.console.document())
+        cursor.setPosition(min(self.input_position, self.console.document().characterCount() - 1))
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        return cursor.selectedText()
+
+    def end_input(self):
+        self.flush()
+        self.console.appendPlainText("")
+        self.at_line_start = True
+        self.input_position = self.console.document().characterCount() - 1
+
+class NumberItem(QTableWidgetItem):
+    # Cellule triée par valeur, et non par texte.
+    def __init__(self, value, text=None):
+        super().__init__(str(value) if text is None else text)
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value < getattr(other, "value", 0)
+
+class ProfileView(QWidget):
+    # Résultats de frenpy.profiler : fonctions puis lignes les plus
+    # coûteuses, triables par colonne. Un double-clic sur une fonction ou une
+    # ligne du script émet line_activated avec son numéro. Les numéros du
+    # code traduit sont ceux de source_lines : voir frenpy.profiler.
+    line_activated = pyqtSignal(int)
+
+    def __init__(self, results, source_lines, parent=None):
+        super().__init__(parent)
+        filename = results["filename"]
+        samples = results["samples"]
+        lines = {int(line): count for line, count in results["lines"].items()}
+        sample_ms = results["elapsed"] * 1000 / samples if samples else 0.0
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel(f"Durée : {results['elapsed'] * 1000:.1f} ms, {samples} échantillons", self))
+        splitter = QSplitter(Qt.Orientation.Vertical, self)
+        layout.addWidget(splitter)
+
+        self.functions = self.table(["Fonction", "Fichier", "Ligne", "Appels", "Temps propre (ms)", "Temps cumulé (ms)"],
+                                    len(results["functions"]))
+        for row, (path, lineno, name, calls, own, total) in enumerate(results["functions"]):
+            mine = path == filename
+            cells = [
+                QTableWidgetItem(name),
+                QTableWidgetItem("" if path == "~" else os.path.basename(path)),
+                NumberItem(lineno if mine else 0, str(lineno) if lineno else ""),
+                NumberItem(calls or 0, "" if calls is None else str(calls)),
+                NumberItem(own, f"{own * 1000:.2f}"),
+                NumberItem(total, f"{total * 1000:.2f}"),
+            ]
+            for column, cell in enumerate(cells):
+                cell.setData(Qt.ItemDataRole.UserRole, lineno if mine else 0)
+                self.functions.setItem(row, column, cell)
+        self.functions.setSortingEnabled(True)
+        self.functions.sortItems(4, Qt.SortOrder.DescendingOrder)
+        splitter.addWidget(self.functions)
+
+        self.lines = self.table(["Ligne", "Échantillons", "Temps estimé (ms)", "%", "Code"], len(lines))
+        for row, (lineno, count) in enumerate(lines.items()):
+            code = source_lines[lineno - 1].strip() if 0 < lineno <= len(source_lines) else ""
+            cells = [
+                NumberItem(lineno),
+                NumberItem(count),
+                NumberItem(count, f"{count * sample_ms:.1f}"),
+                NumberItem(count, f"{100 * count / samples:.1f}" if samples else ""),
+                QTableWidgetItem(code),
+            ]
+            for column, cell in enumerate(cells):
+                cell.setData(Qt.ItemDataRole.UserRole, lineno)
+                self.lines.setItem(row, column, cell)
+        self.lines.setSortingEnabled(True)
+        self.lines.sortItems(1, Qt.SortOrder.DescendingOrder)
+        splitter.addWidget(self.lines)
+
+    def table(self, headers, rows):
+        table = QTableWidget(rows, len(headers), self)
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().hide()
+        table.itemDoubleClicked.connect(self.on_item_activated)
+        return table
+
+    def on_item_activated(self, item):
+        line = item.data(Qt.ItemDataRole.UserRole)
+        if line:
+            self.line_activated.emit(line)
+
+class InterpreterPool(QObject):
+    # Processus "python -m frenpy worker" démarrés à l'avance. Chacun sert
+    # une seule exécution puis s'arrête ; un remplaçant est lancé dès qu'il
+    # est pris, hors du chemin du clic.
+    def __init__(self, size=WARM_INTERPRETERS, parent=None):
+        super().__init__(parent)
+        self.size = max(0, size)
+        self.idle = []
+        # Plus de remplaçants après un échec de lancement (python.exe absent).
+        self.failed = False
+
+    def spawn(self):
+        process = QProcess(self)
+        process.setProgram(PYTHON_EXE)
+        process.setArguments(["-m", "frenpy", "worker"])
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        process.finished.connect(self.on_idle_finished)
+        process.errorOccurred.connect(self.on_idle_error)
+        self.idle.append(process)
+        process.start()
+
+    def fill(self):
+        while not self.failed and len(self.idle) < self.size:
+            self.spawn()
+
+    def take(self):
+        # Un interpréteur prêt, ou None : l'appelant lance alors un processus
+        # ordinaire.
+        while self.idle:
+            process = self.idle.pop(0)
+            process.finished.disconnect(self.on_idle_finished)
+            process.errorOccurred.disconnect(self.on_idle_error)
+            if process.state() != QProcess.ProcessState.NotRunning:
+                QTimer.singleShot(0, self.fill)
+                return process
+            process.deleteLater()
+        QTimer.singleShot(0, self.fill)
+        return None
+
+    def on_idle_finished(self, code, status):
+        process = self.sender()
+        if process in self.idle:
+            self.idle.remove(process)
+            process.deleteLater()
+            QTimer.singleShot(0, self.fill)
+
+    def on_idle_error(self, error):
+        process = self.sender()
+        if error == QProcess.ProcessError.FailedToStart and process in self.idle:
+            self.failed = True
+            self.idle.remove(process)
+            process.deleteLater()
+
+    def refresh(self):
+        # Après un changement de vocabulaire ou d'espace de travail : les
+        # interpréteurs en attente ont chargé l'ancien.
+        self.close()
+        self.failed = False
+        QTimer.singleShot(0, self.fill)
+
+    def close(self):
+        idle, self.idle = self.idle, []
+        for process in idle:
+            process.finished.disconnect(self.on_idle_finished)
+            process.errorOccurred.disconnect(self.on_idle_error)
+            process.kill()
+            process.waitForFinished(1000)
+            process.deleteLater()
+
+class MarkerReader:
+    # Sépare d'un flux de sortie les lignes "<marker><valeur>\n" écrites par
+    # frenpy (fin d'exécution, résultats de profil). feed() renvoie dans
+    # l'ordre des (None, octets) pour la sortie du script et des (valeur,
+    # None) ; un début de marqueur en fin de lecture attend la suite.
+    def __init__(self, marker):
+        self.marker = marker
+        self.pending = b""
+
+    def feed(self, data):
+        data = self.pending + data
+        self.pending = b""
+        marker = self.marker
+        parts = []
+        while data:
+            at = data.find(marker)
+            if at < 0:
+                keep = 0
+                if b"\0" in data[-len(marker):]:
+                    keep = next((size for size in range(len(marker) - 1, 0, -1)
+                                 if data.endswith(marker[:size])), 0)
+                if len(data) > keep:
+                    parts.append((None, data[:len(data) - keep]))
+                self.pending = data[len(data) - keep:]
+                break
+            end = data.find(b"\n", at)
+            if at:
+                parts.append((None, data[:at]))
+            if end < 0:
+                self.pending = data[at:]
+                break
+            parts.append((data[at + len(marker):end].decode(), None))
+            data = data[end + 1:]
+        return parts
+
+    def reset(self):
+        self.pending = b""
+
+class InterpreterHost(QObject):
+    # Processus "python -m frenpy host" gardé toute la session : chaque
+    # exécution y a un sous-interpréteur neuf, sans démarrer de processus.
+    # Une exécution à la fois. Un sous-interpréteur ne s'interrompt pas :
+    # arrêter son script arrête le processus, relancé aussitôt.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self.runner = None
+        self.reader = MarkerReader(END_MARKER)
+        self.available = True
+
+    def start(self):
+        if self.process is not None or not self.available:
+            return
+        self.process = QProcess(self)
+        self.process.setProgram(PYTHON_EXE)
+        self.process.setArguments(["-m", "frenpy", "host"])
         self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
-        self.process.readyReadStandardOutput.connect(lambda: self.output_signal.emit(self.process.readAllStandardOutput().data().decode()))
-        self.process.readyReadStandardError.connect(lambda: self.output_signal.emit(self.process.readAllStandardError().data().decode()))
-        self.process.started.connect(lambda: self.output_signal.emit("Process started"))
-        self.process.finished.connect(lambda code, status: self.output_signal.emit(f"Process finished with code {code}, status {status}"))
+        self.process.readyReadStandardOutput.connect(self.read_output)
+        self.process.finished.connect(self.on_finished)
+        self.process.errorOccurred.connect(self.on_error)
         self.process.start()
-        self.process.waitForFinished()
-        self.finished_signal.emit()
+
+    def accepts(self):
+        return self.available and self.runner is None
+
+    def run(self, runner):
+        self.start()
+        self.runner = runner
+        payload = json.dumps(runner.request).encode()
+        self.process.write(str(len(payload)).encode() + b"\n" + payload)
+
+    def write(self, data):
+        if self.process is not None:
+            self.process.write(data)
+
+    def read_output(self):
+        # Tout ce qui précède END_MARKER appartient à l'exécution en cours.
+        for status, data in self.reader.feed(self.process.readAllStandardOutput().data()):
+            if status is not None:
+                self.finish(status)
+            elif self.runner is not None:
+                self.runner.receive(data)
+
+    def finish(self, status):
+        if status == UNAVAILABLE:
+            # Pas de sous-interpréteurs dans ce Python.
+            self.available = False
+        runner, self.runner = self.runner, None
+        if runner is not None:
+            runner.host_finished(FALLBACK if status == UNAVAILABLE else status)
+
+    def on_finished(self, code, status):
+        self.process.deleteLater()
+        self.process = None
+        self.reader.reset()
+        runner, self.runner = self.runner, None
+        if runner is not None:
+            runner.host_finished(str(code if status == QProcess.ExitStatus.NormalExit else -1))
+        QTimer.singleShot(0, self.start)
+
+    def on_error(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self.available = False
+            self.process.deleteLater()
+            self.process = None
+            runner, self.runner = self.runner, None
+            if runner is not None:
+                runner.host_finished(FALLBACK)
 
     def stop(self):
-        if self.process:
+        if self.process is not None:
+            self.process.kill()
+
+    def refresh(self):
+        # Après un changement d'espace de travail : l'environnement du
+        # processus est celui de son lancement.
+        if self.process is not None and self.runner is None:
+            self.process.kill()
+
+    def close(self):
+        self.available = False
+        if self.process is not None:
+            self.process.kill()
+            self.process.waitForFinished(1000)
+
+class ScriptRunner(QObject):
+    # Un script dans son propre processus "python -m frenpy worker". Tout
+    # passe par les signaux de QProcess dans la boucle d'événements : aucun
+    # thread n'attend la fin. request est la demande JSON envoyée au worker
+    # sur stdin ; avec le code traduit dedans, rien ne passe par le disque.
+    # Avec host, le script passe d'abord par un sous-interpréteur ; il est
+    # relancé dans un processus si un module l'exige ou si host est occupé.
+    # Les limites de temps CPU et de mémoire s'appliquent à tout un
+    # processus : dans host, seules la durée et la sortie sont surveillées.
+    output_signal = pyqtSignal(str)
+    data_signal = pyqtSignal(bytes)
+    started_signal = pyqtSignal()
+    finished_signal = pyqtSignal(int)
+    # Relance dans un processus après un repli : la sortie déjà reçue du
+    # sous-interpréteur est à effacer, le script la réécrira.
+    restart_signal = pyqtSignal()
+    # Résultats de frenpy.profiler, pour une demande avec "profile".
+    profile_signal = pyqtSignal(dict)
+
+    def __init__(self, request, parent=None, pool=None, host=None, limits=None):
+        super().__init__(parent)
+        self.limits = dict(limits or {})
+        self.request = dict(request)
+        self.request["limits"] = {name: self.limits.get(name, 0) for name in ("cpu_seconds", "memory_mb")}
+        self.pool = pool
+        # Le profil est mesuré dans un processus à part, jamais dans host.
+        self.host = host if not self.request.get("profile") else None
+        self.profile_reader = MarkerReader(PROFILE_MARKER) if self.request.get("profile") else None
+        self.hosted = False
+        self.process = None
+        self.started_at = None
+        self.first_output = None
+        self.output_bytes = 0
+        # Nom de la limite atteinte, pour le message de fin.
+        self.limit = None
+        self.watchdog = QTimer(self)
+        self.watchdog.setSingleShot(True)
+        self.watchdog.timeout.connect(lambda: self.limit_reached("timeout_seconds"))
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        if self.limits.get("timeout_seconds") and not self.watchdog.isActive():
+            self.watchdog.start(int(self.limits["timeout_seconds"] * 1000))
+        if self.host is not None and self.host.accepts():
+            self.hosted = True
+            self.host.run(self)
+            self.started_signal.emit()
+            return
+        process = self.pool.take() if self.pool is not None else None
+        if process is not None:
+            self.adopt(process)
+            return
+        self.process = QProcess(self)
+        self.process.setProgram(PYTHON_EXE)
+        self.process.setArguments(["-m", "frenpy", "worker"])
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.connect_process()
+        self.process.started.connect(self.send_request)
+        self.process.start()
+
+    def adopt(self, process):
+        # Interpréteur du pool, déjà démarré : il attend sa demande sur stdin.
+        process.setParent(self)
+        self.process = process
+        self.connect_process()
+        self.send_request()
+        if process.bytesAvailable():
+            self.read_output()
+
+    def send_request(self):
+        self.process.write(json.dumps(self.request).encode() + b"\n")
+        self.started_signal.emit()
+
+    def connect_process(self):
+        # Octets bruts : ConsoleSink décode, un caractère pouvant être coupé
+        # entre deux lectures.
+        self.process.readyReadStandardOutput.connect(self.read_output)
+        self.process.finished.connect(self.on_finished)
+        self.process.errorOccurred.connect(self.on_error)
+
+    def read_output(self):
+        data = self.process.readAllStandardOutput().data()
+        if self.profile_reader is None:
+            self.receive(data)
+            return
+        for results, data in self.profile_reader.feed(data):
+            if results is not None:
+                self.profile_signal.emit(json.loads(results))
+            else:
+                self.receive(data)
+
+    def receive(self, data):
+        if self.first_output is None:
+            self.first_output = time.perf_counter() - self.started_at
+        if self.limit is not None:
+            return
+        self.output_bytes += len(data)
+        max_bytes = int(self.limits.get("output_mb") or 0) << 20
+        if max_bytes and self.output_bytes > max_bytes:
+            data = data[:max(0, len(data) - (self.output_bytes - max_bytes))]
+            self.data_signal.emit(data)
+            self.limit_reached("output_mb")
+            return
+        self.data_signal.emit(data)
+
+    def limit_reached(self, name):
+        # Chien de garde : le script est tué, le message de fin dira pourquoi.
+        if self.limit is None and self.is_running():
+            self.limit = name
+            self.stop()
+
+    def report(self, message, code):
+        self.watchdog.stop()
+        if self.limit is None:
+            if code == MEMORY_EXIT_CODE:
+                self.limit = "memory_mb"
+            elif code in (CPU_EXIT_CODE, WINDOWS_CPU_EXIT_CODE) and self.limits.get("cpu_seconds"):
+                self.limit = "cpu_seconds"
+        if self.limit is not None:
+            value = self.limits.get(self.limit)
+            unit = {"cpu_seconds": "s", "timeout_seconds": "s"}.get(self.limit, "Mo")
+            self.output_signal.emit(f"Limite de {LIMIT_NAMES[self.limit]} atteinte ({value} {unit}) : script arrêté.")
+        if self.first_output is not None:
+            message += f" (premier affichage après {self.first_output * 1000:.1f} ms)"
+        self.output_signal.emit(message)
+        self.finished_signal.emit(code)
+
+    def on_finished(self, code, status):
+        self.report(f"Process finished with code {code}, status {status}", code)
+
+    def host_finished(self, status):
+        self.hosted = False
+        if status == FALLBACK:
+            self.restart_signal.emit()
+            self.first_output = None
+            self.output_bytes = 0
+            self.output_signal.emit("Sous-interpréteur impossible pour ce script : relance dans un processus.")
+            self.host = None
+            self.start()
+            return
+        code = int(status)
+        self.report(f"Sous-interpréteur terminé avec le code {code}", code)
+
+    def on_error(self, error):
+        # Un processus qui n'a pas démarré n'émet jamais finished.
+        if error == QProcess.ProcessError.FailedToStart:
+            self.watchdog.stop()
+            self.output_signal.emit(f"Impossible de lancer le script : {self.process.errorString()}")
+            self.finished_signal.emit(-1)
+
+    def is_running(self):
+        if self.hosted:
+            return True
+        return self.process is not None and self.process.state() != QProcess.ProcessState.NotRunning
+
+    def stop(self):
+        if self.hosted:
+            self.host.stop()
+        elif self.is_running():
             self.process.kill()
-            self.finished_signal.emit()
 
     def write_input(self, text):
-        if self.process:
+        if self.hosted:
+            self.host.write(text.encode() + b'\n')
+        elif self.is_running():
             self.process.write(text.encode())
             self.process.write(b'\n')
 
+class RunManager(QObject):
+    # Lance les scripts en gardant au plus max_running processus à la fois ;
+    # les autres attendent dans l'ordre d'arrivée.
+    started_signal = pyqtSignal(object)
+    finished_signal = pyqtSignal(object, int)
+
+    def __init__(self, max_running=MAX_RUNNING_SCRIPTS, parent=None):
+        super().__init__(parent)
+        self.max_running = max(1, max_running)
+        self.running = []
+        self.waiting = deque()
+
+    def submit(self, runner):
+        # Renvoie False si le script doit attendre.
+        runner.finished_signal.connect(lambda code, runner=runner: self.on_finished(runner, code))
+        if len(self.running) < self.max_running:
+            self.launch(runner)
+            return True
+        self.waiting.append(runner)
+        return False
+
+    def launch(self, runner):
+        self.running.append(runner)
+        self.started_signal.emit(runner)
+        runner.start()
+
+    def on_finished(self, runner, code):
+        if runner not in self.running:
+            return
+        self.running.remove(runner)
+        self.finished_signal.emit(runner, code)
+        while self.waiting and len(self.running) < self.max_running:
+            self.launch(self.waiting.popleft())
+
+    def stop(self, runner):
+        if runner in self.waiting:
+            self.waiting.remove(runner)
+            self.finished_signal.emit(runner, -1)
+        else:
+            runner.stop()
+
+    def stop_all(self):
+        for runner in list(self.waiting):
+            self.stop(runner)
+        for runner in list(self.running):
+            runner.stop()
+            if runner.process is not None:
+                runner.process.waitForFinished(1000)
+
 class FrenpyIDE(QMainWindow):
     def __init__(self):
         super().__init__()
         self.init_ui()
-        self.script_runner = None
-        self.script_running = False
+        # Console de chaque exécution -> (ScriptRunner, ConsoleSink, titre).
+        self.runs = {}
+        config = read_config()
+        self.run_manager = RunManager(config.get("max_running_scripts", MAX_RUNNING_SCRIPTS), self)
+        self.interpreter_pool = InterpreterPool(config.get("warm_interpreters", WARM_INTERPRETERS), self)
+        QTimer.singleShot(0, self.interpreter_pool.fill)
+        self.interpreter_host = InterpreterHost(self)
+        self.run_limits = dict(RUN_LIMITS, **config.get("run_limits", {}))
+        self.subinterpreter_action.setChecked(config.get("subinterpreter_runs", SUBINTERPRETER_RUNS))
+        self.run_manager.started_signal.connect(self.on_script_started)
+        self.run_manager.finished_signal.connect(self.on_script_finished)
+        self.file_loader = None
+        self.loading_editor = None
+        self.vocabulary = get_vocabulary()
+        self.completion_request = 0
+        self.completion_prefix = ""
+        self.completion_worker = CompletionWorker(self.vocabulary)
+        self.completion_worker.results_signal.connect(self.show_completions)
+        self.completion_worker.start()
+        self.completer = AutoCompleter([], self)
+        self.completer.activated.connect(self.insert_completion)
+        self.vocabulary_watcher = QFileSystemWatcher(self)
+        self.vocabulary_watcher.fileChanged.connect(self.reload_vocabulary)
+        self.vocabulary_watcher.directoryChanged.connect(self.reload_vocabulary)
+        self.watch_vocabulary()
+
+    def watch_vocabulary(self):
+        # Les dossiers sont surveillés aussi, pour voir apparaître un fichier
+        # de vocabulaire qui n'existait pas encore. Pour un dossier absent
+        # (.frenpy pas encore créé), c'est le plus proche parent existant :
+        # reload_vocabulary rappelle cette méthode quand il change, qui
+        # descend alors d'un cran.
+        paths = []
+        for layer in vocabulary_layers():
+            if os.path.exists(layer):
+                paths.append(layer)
+            folder = os.path.dirname(layer)
+            while not os.path.isdir(folder) and os.path.dirname(folder) != folder:
+                folder = os.path.dirname(folder)
+            if os.path.isdir(folder) and folder not in paths:
+                paths.append(folder)
+        watched = set(self.vocabulary_watcher.files() + self.vocabulary_watcher.directories())
+        stale = [path for path in watched if path not in paths]
+        if stale:
+            self.vocabulary_watcher.removePaths(stale)
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self.vocabulary_watcher.addPaths(missing)
+
+    def reload_vocabulary(self, _=None):
+        # Rechargement à chaud : seules les lignes qui contiennent un mot
+        # modifié sont retraduites dans les onglets ouverts.
+        self.watch_vocabulary()
+        vocabulary = get_vocabulary()
+        if vocabulary is self.vocabulary:
+            return
+        self.vocabulary = vocabulary
+        for index in range(self.tab_widget.count()):
+            editor = self.tab_widget.widget(index)
+            if isinstance(editor, CodeEditor):
+                editor.set_vocabulary(vocabulary)
+        self.completion_worker.set_vocabulary(vocabulary)
+        self.interpreter_pool.refresh()
+        self.console_output.appendPlainText("Vocabulaire rechargé.")
 
     def init_ui(self):
         self.setWindowTitle("Frenpy IDE")
@@ -239,8 +1474,18 @@ class FrenpyIDE(QMainWindow):
         main_layout = QVBoxLayout(main_area)
         splitter.addWidget(main_area)
 
+        file_layout = QHBoxLayout()
         self.current_file_label = QLabel("Aucun fichier sélectionné", self)
-        main_layout.addWidget(self.current_file_label)
+        file_layout.addWidget(self.current_file_label)
+        self.load_progress = QProgressBar(self)
+        self.load_progress.setRange(0, 100)
+        self.load_progress.hide()
+        file_layout.addWidget(self.load_progress)
+        self.cancel_load_button = QPushButton("Annuler", self)
+        self.cancel_load_button.clicked.connect(self.cancel_loading)
+        self.cancel_load_button.hide()
+        file_layout.addWidget(self.cancel_load_button)
+        main_layout.addLayout(file_layout)
 
         self.tab_widget = QTabWidget()
         self.tab_widget.setTabsClosable(True)
@@ -250,10 +1495,17 @@ class FrenpyIDE(QMainWindow):
 
         self.create_menu_bar()
 
+        # Un onglet "Console" pour les messages de l'IDE, puis un onglet par
+        # exécution.
+        self.console_tabs = QTabWidget()
+        self.console_tabs.setTabsClosable(True)
+        self.console_tabs.tabCloseRequested.connect(self.close_console_tab)
         self.console_output = QPlainTextEdit(self)
-        self.console_output.setReadOnly(False)
-        self.console_output.installEventFilter(self)
-        main_layout.addWidget(self.console_output)
+        self.console_output.setReadOnly(True)
+        self.console_output.setMaximumBlockCount(read_config().get("console_scrollback", CONSOLE_SCROLLBACK))
+        self.console_tabs.addTab(self.console_output, "Console")
+        self.console_tabs.tabBar().setTabButton(0, self.console_tabs.tabBar().ButtonPosition.RightSide, None)
+        main_layout.addWidget(self.console_tabs)
 
         button_layout = QHBoxLayout()
 
@@ -261,6 +1513,10 @@ class FrenpyIDE(QMainWindow):
         run_button.clicked.connect(self.run_script)
         button_layout.addWidget(run_button)
 
+        profile_button = QPushButton("Profile Script", self)
+        profile_button.clicked.connect(self.profile_script)
+        button_layout.addWidget(profile_button)
+
         stop_button = QPushButton("Stop Script", self)
         stop_button.clicked.connect(self.stop_script)
         button_layout.addWidget(stop_button)
@@ -323,40 +1579,129 @@ class FrenpyIDE(QMainWindow):
         export_workspace_action.triggered.connect(self.export_workspace)
         workspace_menu.addAction(export_workspace_action)
 
+        tools_menu = menu_bar.addMenu("&Tools")
+
+        latency_action = QAction("Keystroke &Latency", self)
+        latency_action.triggered.connect(self.show_key_latency)
+        tools_menu.addAction(latency_action)
+
+        self.subinterpreter_action = QAction("&Sub-interpreter Runs", self)
+        self.subinterpreter_action.setCheckable(True)
+        self.subinterpreter_action.toggled.connect(self.toggle_subinterpreter_runs)
+        tools_menu.addAction(self.subinterpreter_action)
+
     def new_file(self):
         editor = CodeEditor()
-        self.highlighter = PythonHighlighter(editor.document())
-        self.tab_widget.addTab(editor, "Untitled")
-        self.tab_widget.setCurrentWidget(editor)
+        self.add_tab(editor, "Untitled")
         self.current_file_label.setText("Aucun fichier sélectionné")
 
+    def add_tab(self, editor, title):
+        self.tab_widget.addTab(editor, title)
+        self.tab_widget.setCurrentWidget(editor)
+        if isinstance(editor, CodeEditor):
+            editor.completer = self.completer
+            editor.dirty_changed.connect(self.on_dirty_changed)
+            editor.lines_changed.connect(self.on_lines_changed)
+            editor.textChanged.connect(self.text_changed)
+
+    def on_lines_changed(self, first, count, lines):
+        self.completion_worker.update_lines(id(self.sender()), first, count, lines)
+
+    def on_dirty_changed(self, dirty):
+        index = self.tab_widget.indexOf(self.sender())
+        if index != -1:
+            title = self.tab_widget.tabText(index).rstrip("*")
+            self.tab_widget.setTabText(index, title + "*" if dirty else title)
+
     def open_file(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open File", "", "Frenpy files (*.frenpy);;All Files (*)")
         if file_path:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-                editor = CodeEditor()
-                editor.setPlainText(content)
-                self.highlighter = PythonHighlighter(editor.document())
-                self.tab_widget.addTab(editor, os.path.basename(file_path))
-                self.tab_widget.setCurrentWidget(editor)
-            self.current_file_label.setText(file_path)
+            self.open_path(file_path)
+
+    def open_path(self, file_path):
+        # Un seul chargement à la fois : ouvrir un autre fichier annule le
+        # précédent. Les gros fichiers sont projetés en mémoire, sans lecture.
+        self.cancel_loading()
+        if os.path.getsize(file_path) >= LARGE_FILE_BYTES:
+            editor = LargeFileViewer(file_path)
+            editor.file_path = file_path
+            self.console_output.appendPlainText(f"{file_path} est ouvert en lecture seule (fichier volumineux).")
+        else:
+            editor = CodeEditor()
+            editor.file_path = file_path
+            editor.begin_load()
+            self.file_loader = FileLoader(file_path)
+            self.file_loader.chunk_signal.connect(self.on_file_chunk)
+            self.file_loader.progress_signal.connect(self.load_progress.setValue)
+            self.file_loader.loaded_signal.connect(self.on_file_loaded)
+            self.file_loader.error_signal.connect(self.on_file_load_error)
+            self.loading_editor = editor
+            self.load_progress.setValue(0)
+            self.load_progress.show()
+            self.cancel_load_button.show()
+            self.file_loader.start()
+        self.add_tab(editor, os.path.basename(file_path))
+        self.current_file_label.setText(file_path)
+
+    def on_file_chunk(self, text):
+        self.loading_editor.append_chunk(text)
+        self.file_loader.chunk_done()
+
+    def finish_loading(self):
+        self.file_loader.wait()
+        self.file_loader = None
+        self.loading_editor = None
+        self.load_progress.hide()
+        self.cancel_load_button.hide()
+
+    def on_file_loaded(self, encoding):
+        self.loading_editor.end_load()
+        if encoding not in ("utf-8", "utf-8-sig"):
+            self.console_output.appendPlainText(f"{self.file_loader.file_path} : encodage {encoding} détecté.")
+        self.finish_loading()
+
+    def on_file_load_error(self, message):
+        self.console_output.appendPlainText(f"Erreur lors de l'ouverture : {message}")
+        self.discard_loading_tab()
+        self.finish_loading()
+
+    def cancel_loading(self):
+        if self.file_loader is None:
+            return
+        self.file_loader.cancel()
+        self.file_loader.chunk_signal.disconnect()
+        self.file_loader.loaded_signal.disconnect()
+        self.file_loader.error_signal.disconnect()
+        self.console_output.appendPlainText(f"Chargement de {self.file_loader.file_path} annulé.")
+        self.discard_loading_tab()
+        self.finish_loading()
+
+    def discard_loading_tab(self):
+        index = self.tab_widget.indexOf(self.loading_editor)
+        if index != -1:
+            self.tab_widget.removeTab(index)
+        self.loading_editor.deleteLater()
 
     def save_file(self):
         current_editor = self.tab_widget.currentWidget()
-        if current_editor:
+        if current_editor is not None and current_editor is self.loading_editor:
+            # Enregistrer un texte à moitié chargé tronquerait le fichier.
+            self.console_output.appendPlainText("Chargement en cours : enregistrement impossible.")
+            return
+        if isinstance(current_editor, CodeEditor):
             if current_editor.file_path:
                 with open(current_editor.file_path, "w", encoding="utf-8") as file:
                     content = current_editor.toPlainText()
                     file.write(content)
                 self.tab_widget.setTabText(self.tab_widget.currentIndex(), os.path.basename(current_editor.file_path))
+                current_editor.document().setModified(False)
                 self.current_file_label.setText(current_editor.file_path)
             else:
                 self.save_file_as()
 
     def save_file_as(self):
         current_editor = self.tab_widget.currentWidget()
-        if current_editor:
+        if isinstance(current_editor, CodeEditor):
             file_path, _ = QFileDialog.getSaveFileName(self, "Save File As", "", "Frenpy files (*.frenpy);;All Files (*)")
             if file_path:
                 current_editor.file_path = file_path
@@ -364,21 +1709,25 @@ class FrenpyIDE(QMainWindow):
                     content = current_editor.toPlainText()
                     file.write(content)
                 self.tab_widget.setTabText(self.tab_widget.currentIndex(), os.path.basename(file_path))
+                current_editor.document().setModified(False)
                 self.current_file_label.setText(file_path)
 
     def save_all_files(self):
         for index in range(self.tab_widget.count()):
             editor = self.tab_widget.widget(index)
+            if not isinstance(editor, CodeEditor):
+                continue
             file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "Frenpy files (*.frenpy);;All Files (*)")
             if file_path:
                 with open(file_path, "w") as file:
                     content = editor.toPlainText()
                     file.write(content)
                 self.tab_widget.setTabText(index, os.path.basename(file_path))
+                editor.document().setModified(False)
 
     def save_remaining_files(self):
         current_editor = self.tab_widget.currentWidget()
-        if current_editor:
+        if isinstance(current_editor, CodeEditor):
             appdata_path = os.path.join(os.getenv('APPDATA'), 'frenpy_ide')
             os.makedirs(appdata_path, exist_ok=True)
             file_path = os.path.join(appdata_path, 'remaining_files.frenpy')
@@ -387,35 +1736,77 @@ class FrenpyIDE(QMainWindow):
                 file.write(content)
             self.console_output.appendPlainText(f"Fichiers restants enregistrés: {file_path}")
 
-    def run_script(self):
+    def run_script(self, profile=False):
         """Runs the current script using Frenpy."""
-        if self.script_running:
-            self.console_output.appendPlainText("Un script est déjà en cours d'exécution.")
-            return
         current_editor = self.tab_widget.currentWidget()
-        if current_editor:
+        if isinstance(current_editor, CodeEditor):
             script_content = current_editor.toPlainText()
             if script_content:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".frenpy", mode='w', encoding='utf-8') as temp_file:
-                    temp_file.write(script_content)
-                    temp_file_path = temp_file.name
-                compiled_code = compile_frenpy(temp_file_path)
+                compiled_code = current_editor.compiler_session.compiled_text()
                 if compiled_code:
-                    if "frpy_debug=True" in compiled_code:
+                    if "frpy_debug=True" in script_content:
                         self.console_output.appendPlainText(f"Code compilé :\n{compiled_code}")
                         self.console_output.appendPlainText(f"Code source :\n{script_content}")
+                        _, stats = compile_frenpy_source(script_content, with_stats=True)
+                        self.console_output.appendPlainText(stats.summary())
                     if "frpy_scc=True" in script_content:
                         self.save_actual_file("compiled.py", compiled_code)
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".py", mode='w', encoding='utf-8') as compiled_file:
-                        compiled_file.write(compiled_code)
-                        compiled_file_path = compiled_file.name
-                    self.script_runner = ScriptRunner(compiled_file_path)
-                    self.script_runner.output_signal.connect(self.console_output.appendPlainText)
-                    self.script_runner.started_signal.connect(self.on_script_started)
-                    self.script_runner.finished_signal.connect(self.on_script_finished)
-                    self.script_runner.input_signal.connect(self.script_runner.write_input)
-                    self.script_runner.start()
-                    os.remove(temp_file_path)
+                    # Le code traduit part au worker par son stdin : aucun
+                    # fichier temporaire. Une erreur de syntaxe est affichée
+                    # par le worker, avec son traceback.
+                    file_path = current_editor.file_path
+                    request = {"code": compiled_code, "filename": file_path or "<editeur>"}
+                    if file_path:
+                        request["search_path"] = os.path.dirname(file_path)
+                    if not file_path or current_editor.document().isModified():
+                        request["source"] = script_content
+                    title = os.path.basename(file_path) if file_path else "Untitled"
+                    if profile:
+                        request["profile"] = True
+                        title = f"{title} (profil)"
+                    host = self.interpreter_host if self.subinterpreter_action.isChecked() else None
+                    runner = ScriptRunner(request, self, self.interpreter_pool, host, self.run_limits)
+                    runner.profile_signal.connect(
+                        lambda results, editor=current_editor, title=title: self.show_profile(editor, title, results))
+                    self.start_run(runner, title)
+
+    def profile_script(self):
+        self.run_script(profile=True)
+
+    def show_profile(self, editor, title, results):
+        # La traduction garde les numéros de ligne, le vocabulaire refusant
+        # les sauts de ligne : ceux du profil sont ceux de l'éditeur. Les
+        # lignes au-delà du texte actuel (modifié depuis) sont ignorées.
+        source_lines = editor.toPlainText().split("\n")
+        lines = {int(line): count for line, count in results["lines"].items() if int(line) <= len(source_lines)}
+        hottest = max(lines.values(), default=0)
+        editor.set_line_heat({line: count / hottest for line, count in lines.items()})
+        view = ProfileView(results, source_lines)
+        view.line_activated.connect(lambda line, editor=editor: self.goto_editor_line(editor, line))
+        self.console_tabs.addTab(view, f"Profil {title}")
+        self.console_tabs.setCurrentWidget(view)
+
+    def goto_editor_line(self, editor, line):
+        if self.tab_widget.indexOf(editor) == -1:
+            return
+        self.tab_widget.setCurrentWidget(editor)
+        cursor = QTextCursor(editor.document().findBlockByNumber(line - 1))
+        editor.setTextCursor(cursor)
+        editor.centerCursor()
+        editor.setFocus()
+
+    def start_run(self, runner, title):
+        console = QPlainTextEdit()
+        console.installEventFilter(self)
+        sink = ConsoleSink(console, read_config().get("console_scrollback", CONSOLE_SCROLLBACK))
+        runner.data_signal.connect(sink.write)
+        runner.output_signal.connect(sink.write_line)
+        runner.restart_signal.connect(sink.rewind)
+        self.runs[console] = (runner, sink, title)
+        self.console_tabs.addTab(console, title)
+        self.console_tabs.setCurrentWidget(console)
+        if not self.run_manager.submit(runner):
+            sink.write_line(f"En attente : {len(self.run_manager.running)} scripts déjà en cours.")
 
     def save_actual_file(self, fichier_name, content):
         try:
@@ -425,34 +1816,71 @@ class FrenpyIDE(QMainWindow):
         except Exception as errors:
             self.console_output.appendPlainText(f"Erreur lors de l'enregistrement : {str(errors)}")
 
-    def stop_script(self):
-        if self.script_running:
-            self.script_runner.stop()
-            self.script_running = False
-
-    def on_script_started(self):
-        self.script_running = True
-        self.console_output.appendPlainText("Le script a été lancé.")
+    def run_console(self, runner):
+        for console, run in self.runs.items():
+            if run[0] is runner:
+                return console
+        return None
 
-    def on_script_finished(self):
-        self.script_running = False
-        self.console_output.appendPlainText("Le script a été arrêté.")
+    def stop_script(self):
+        # Arrête le script de l'onglet affiché, ou le dernier lancé depuis
+        # l'onglet "Console".
+        run = self.runs.get(self.console_tabs.currentWidget())
+        if run is not None:
+            self.run_manager.stop(run[0])
+        elif self.run_manager.running:
+            self.run_manager.stop(self.run_manager.running[-1])
+
+    def on_script_started(self, runner):
+        console = self.run_console(runner)
+        if console is not None:
+            _, sink, title = self.runs[console]
+            sink.write_line("Le script a été lancé.")
+            sink.set_mark()
+            self.console_tabs.setTabText(self.console_tabs.indexOf(console), f"{title} ▶")
+
+    def on_script_finished(self, runner, code):
+        console = self.run_console(runner)
+        if console is not None:
+            _, sink, title = self.runs[console]
+            sink.write_line("Le script a été arrêté.")
+            self.console_tabs.setTabText(self.console_tabs.indexOf(console), f"{title} ({code})")
+
+    def close_console_tab(self, index):
+        console = self.console_tabs.widget(index)
+        run = self.runs.pop(console, None)
+        if run is None:
+            # Vue de profil ; l'onglet "Console" n'a pas de bouton de fermeture.
+            if index:
+                self.console_tabs.removeTab(index)
+                console.deleteLater()
+            return
+        runner = run[0]
+        if runner.is_running():
+            runner.finished_signal.connect(runner.deleteLater)
+            self.run_manager.stop(runner)
+        else:
+            self.run_manager.stop(runner)
+            runner.deleteLater()
+        self.console_tabs.removeTab(index)
+        console.deleteLater()
 
     def on_tree_view_clicked(self, index):
         file_path = self.model.filePath(index)
         if QDir(file_path).exists():
             return 
-        with open(file_path, "r", encoding="utf-8") as file:
-            content = file.read()
-            editor = CodeEditor()
-            editor.setPlainText(content)
-            self.highlighter = PythonHighlighter(editor.document())
-            self.tab_widget.addTab(editor, os.path.basename(file_path))
-            self.tab_widget.setCurrentWidget(editor)
-        self.current_file_label.setText(file_path)
+        self.open_path(file_path)
 
     def close_tab(self, index):
+        editor = self.tab_widget.widget(index)
+        if editor is not None and editor is self.loading_editor:
+            self.cancel_loading()
+            return
         self.tab_widget.removeTab(index)
+        if isinstance(editor, LargeFileViewer):
+            editor.close_file()
+        elif isinstance(editor, CodeEditor):
+            self.completion_worker.remove_document(id(editor))
 
     def update_current_file_label(self, index):
         if index != -1:
@@ -466,6 +1894,11 @@ class FrenpyIDE(QMainWindow):
         dir_path = QFileDialog.getExistingDirectory(self, "Open Workspace", "")
         if dir_path:
             self.tree.setRootIndex(self.model.index(dir_path))
+            set_workspace(dir_path)
+            self.interpreter_pool.refresh()
+            self.interpreter_host.refresh()
+            self.reload_vocabulary()
+            self.completion_worker.scan_workspace(dir_path)
             self.console_output.appendPlainText(f"Espace de travail ouvert: {dir_path}")
 
     def export_workspace(self):
@@ -481,44 +1914,85 @@ class FrenpyIDE(QMainWindow):
                 self.console_output.appendPlainText(f"Espace de travail exporté: {zip_path}")
 
     def text_changed(self):
+        # La requête part au CompletionWorker ; la liste s'affiche quand la
+        # réponse arrive, si aucune frappe ne l'a rendue périmée.
         current_editor = self.tab_widget.currentWidget()
-        if current_editor:
-            cursor = current_editor.textCursor()
-            cursor.select(cursor.SelectionType.WordUnderCursor)
-            word = cursor.selectedText()
-            if word:
-                self.completer.setCompletionPrefix(word)
-                self.completer.complete()
+        if current_editor is not self.sender() or current_editor.isReadOnly():
+            return
+        cursor = current_editor.textCursor()
+        cursor.select(cursor.SelectionType.WordUnderCursor)
+        word = cursor.selectedText()
+        self.completion_request += 1
+        if len(word) < COMPLETION_MIN_PREFIX:
+            self.completer.popup().hide()
+            return
+        self.completion_prefix = word
+        self.completion_worker.query(self.completion_request, word)
+
+    def show_completions(self, request, words):
+        current_editor = self.tab_widget.currentWidget()
+        if request != self.completion_request or not isinstance(current_editor, CodeEditor):
+            return
+        popup = self.completer.popup()
+        if not words:
+            popup.hide()
+            return
+        self.completer.setWidget(current_editor)
+        self.completer.model().setStringList(words)
+        self.completer.setCompletionPrefix(self.completion_prefix)
+        rect = current_editor.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+        popup.setCurrentIndex(self.completer.completionModel().index(0, 0))
+
     def insert_completion(self, completion):
         current_editor = self.tab_widget.currentWidget()
-        if current_editor:
+        if isinstance(current_editor, CodeEditor):
             cursor = current_editor.textCursor()
             cursor.select(cursor.SelectionType.WordUnderCursor)
             cursor.insertText(completion)
             current_editor.setTextCursor(cursor)
+            self.completion_worker.touch(completion)
 
     def eventFilter(self, obj, event):
-        if obj == self.console_output and event.type() == QEvent.Type.KeyPress:
+        run = self.runs.get(obj) if isinstance(obj, QPlainTextEdit) else None
+        if run is not None and event.type() == QEvent.Type.KeyPress:
             if event.key() == Qt.Key.Key_Return:
-                cursor = self.console_output.textCursor()
+                runner, sink, _ = run
+                cursor = obj.textCursor()
                 cursor.movePosition(cursor.MoveOperation.End)
-                self.console_output.setTextCursor(cursor)
-                text = self.console_output.toPlainText().split('\n')[-1]
-                self.console_output.appendPlainText('')
-                if self.script_runner:
-                    self.script_runner.write_input(text)
+                obj.setTextCursor(cursor)
+                text = sink.input_text()
+                sink.end_input()
+                runner.write_input(text)
                 return True
         return super().eventFilter(obj, event)
 
     def closeEvent(self, event):
         try:
-            if self.script_running and self.script_runner:
-                self.script_runner.stop()
+            self.cancel_loading()
+            self.completion_worker.stop()
+            self.run_manager.stop_all()
+            self.interpreter_pool.close()
+            self.interpreter_host.close()
             event.accept()
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la fermeture: {str(e)}")
             event.ignore()
 
+    def toggle_subinterpreter_runs(self, checked):
+        # Le processus hôte démarre dès l'activation, pas au premier script.
+        if checked:
+            self.interpreter_host.start()
+            if self.run_limits.get("cpu_seconds") or self.run_limits.get("memory_mb"):
+                self.console_output.appendPlainText(
+                    "Sous-interpréteurs : les limites de temps CPU et de mémoire ne s'y appliquent pas.")
+
+    def show_key_latency(self):
+        current_editor = self.tab_widget.currentWidget()
+        if isinstance(current_editor, CodeEditor):
+            self.console_output.appendPlainText(current_editor.latency_summary())
+
     def display_words(self):
         words = get_words_frenpy()
         self.console_output.appendPlainText("Mots disponibles : " + ", ".join(words))
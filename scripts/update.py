@@ -1,6 +1,7 @@
 import os
 import subprocess
 import json
+import tempfile
 
 def download_file(url, local_path):
     try:
@@ -18,15 +19,40 @@ def read_json_file(filepath):
         print(f"Erreur lors de la lecture du fichier JSON {filepath} : {e}")
         exit(1)
 
+def merge_config(local, remote):
+    # Les réglages locaux sont gardés ; les clés ajoutées par la nouvelle
+    # version sont reprises de la configuration distante.
+    merged = dict(remote)
+    for key, value in local.items():
+        if key == "version":
+            continue
+        if isinstance(value, dict) and isinstance(remote.get(key), dict):
+            merged[key] = merge_config(value, remote[key])
+        else:
+            merged[key] = value
+    return merged
+
+def write_json_file(filepath, data):
+    # Fichier temporaire puis remplacement : une écriture interrompue ne
+    # laisse jamais un config.json vide.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filepath)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=4)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
 def update_if_needed(local_version, remote_version, local_file_path, json_remote, remote_file_path):
     if local_version < remote_version:
         print("Une mise à jour est nécessaire. Exécution du script de mise à jour...")
         try:
             subprocess.run(["curl", "--ssl-no-revoke", "https://raw.githubusercontent.com/slohwnix/frenPY-ide/refs/heads/main/scripts/frenpy_ide.py", "-o", "scripts/frenpy_ide.py"], check=True)
             print("Script mis à jour avec succès.")
-            # Mettre à jour la version dans le fichier local
-            with open(local_file_path, 'w') as file:
-                json.dump(json_remote, file, indent=4)
+            # Mettre à jour la version dans le fichier local, sans perdre ses réglages
+            merged = merge_config(read_json_file(local_file_path), json_remote)
+            write_json_file(local_file_path, merged)
             print(f"Version mise à jour dans {local_file_path}")
         except subprocess.SubprocessError as e:
             print(f"Erreur lors de la mise à jour du script : {e}")
@@ -38,8 +64,10 @@ def update_if_needed(local_version, remote_version, local_file_path, json_remote
     print(f"Fichier supprimé : {remote_file_path}")
 
 def install_dependencies():
+    # frenpy n'est pas installé par pip : la copie livrée dans
+    # python/Lib/site-packages contient les modules dont l'IDE dépend.
     try:
-        subprocess.run(["python", "-m", "pip", "install", "pyqt6", "frenpy", "--upgrade"], check=True)
+        subprocess.run(["python", "-m", "pip", "install", "pyqt6", "--upgrade"], check=True)
     except subprocess.SubprocessError as e:
         print(f"Erreur lors de l'installation des dépendances : {e}")
         exit(1)
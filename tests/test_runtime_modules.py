@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python", "Lib", "site-packages"))
+
+from frenpy import load
+from frenpy.main import run_code
+from frenpy.vocabulary import get_vocabulary
+
+SCRIPT = 'attendre(0)\nnouvelle_écran\nresultat = "ok"\n'
+
+
+class RuntimeModulesTest(unittest.TestCase):
+    # "attendre" et "nouvelle_écran" se traduisent en time.sleep et
+    # os.system sans import : le module exécuté doit déjà les connaître.
+    def setUp(self):
+        self.system = mock.patch("os.system", return_value=0).start()
+        self.addCleanup(mock.patch.stopall)
+        self.addCleanup(setattr, sys, "argv", list(sys.argv))
+        self.addCleanup(setattr, sys, "path", list(sys.path))
+
+    def test_load(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "runtime_modules.frenpy")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(SCRIPT)
+        module = load(path)
+        self.assertEqual(module.resultat, "ok")
+        self.system.assert_called_once_with("cls")
+
+    def test_run_code(self):
+        run_code(get_vocabulary().translate(SCRIPT), "<runtime_modules>", os.getcwd(), source=SCRIPT)
+        self.system.assert_called_once_with("cls")
+
+
+if __name__ == "__main__":
+    unittest.main()